@@ -104,7 +104,8 @@ def interactive_load_duration_curve(dict_analysis_config, dict_results, dict_loa
     fl_limit = inp if inp else None
 
     # 2. Perform analysis.
-    ldc = load_duration_curve.create_load_duration_curve(ts_load)
+    ldc = load_duration_curve.create_load_duration_curve(
+        ts_load, plotting.INT_PLOT_RESOLUTION)
 
     # 3. Present results graphically or numerically.
     plotting.plot_load_duration_curve(ldc, fl_limit=fl_limit)
@@ -1,24 +1,26 @@
 # Aggregation factor: The ratio between a child's load at the point of the node's aggregated max load, and the child's max load
 # Norsk: "Sammenlagringsfaktor"
 
-from load_aggregation import aggregate_load_of_node
-from max_load import find_max_load
+import numpy as np
+from analysis.methods.load_aggregation import aggregate_load_of_node
+from analysis.methods.max_load import find_max_load, find_max_load_and_index
 import objects.network as network
 
 def aggregation_factors(str_bus_ID, dict_loads_ts, g_network): 
 
     ts_aggregate = aggregate_load_of_node(str_bus_ID, dict_loads_ts, g_network)
-    fl_max, int_max_index = find_max_load(ts_aggregate)
+    fl_max, int_max_index = find_max_load_and_index(ts_aggregate)
 
     dict_aggregation_factors = {}
     list_children = network.list_children_of_node(str_bus_ID, g_network)
     for  str_child_ID in list_children:
         # find load of child at init_max_index
         ts_child = dict_loads_ts[str_child_ID]
-        fl_child_load_at_max = ts_child[int_max_index,1]
+        fl_child_load_at_max = load_at_time(
+            ts_child, ts_aggregate[:, 0][int_max_index])
 
         # find child's max load
-        c_max, c_max_index = find_max_load(ts_child)
+        c_max = find_max_load(ts_child)
         dict_aggregation_factors[str_child_ID] = fl_child_load_at_max/c_max
 
     return dict_aggregation_factors
@@ -28,15 +30,30 @@ def aggregation_factors(str_bus_ID, dict_loads_ts, g_network):
 def coincidence_factors(str_bus_ID, dict_loads_ts, g_network): 
 
     ts_aggregate = aggregate_load_of_node(str_bus_ID, dict_loads_ts, g_network)
-    fl_max, int_max_index = find_max_load(ts_aggregate)
+    fl_max, int_max_index = find_max_load_and_index(ts_aggregate)
 
     dict_coincidence_factors = {}
     list_children = network.list_children_of_node(str_bus_ID, g_network)
     for  str_child_ID in list_children:
         # find load of child at init_max_index
         ts_child = dict_loads_ts[str_child_ID]
-        fl_child_load_at_max = ts_child[int_max_index,1]
+        fl_child_load_at_max = load_at_time(
+            ts_child, ts_aggregate[:, 0][int_max_index])
 
         dict_coincidence_factors[str_child_ID] = fl_child_load_at_max/fl_max
     
-    return dict_coincidence_factors
\ No newline at end of file
+    return dict_coincidence_factors
+
+
+def load_at_time(ts_load, dt64_time):
+    """Returns load of a timeseries at a timestamp, NaN if it is missing.
+
+    Notes
+    ----------
+    Looks the timestamp up rather than using the row of the aggregate, as
+    loads with missing datapoints are not aligned with their aggregate.
+    """
+    int_index = np.searchsorted(ts_load[:, 0], dt64_time)
+    if int_index < len(ts_load) and ts_load[:, 0][int_index] == dt64_time:
+        return ts_load[int_index, 1]
+    return np.nan
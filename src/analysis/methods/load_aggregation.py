@@ -3,9 +3,10 @@
 
 import objects.timeseries as ts
 import objects.network as network
-import numpy as np
+import objects.load_points as load_points
 
-def aggregate_load_of_node(str_load_ID, dict_loads_ts, g_network):
+def aggregate_load_of_node(str_load_ID, dict_loads_ts, g_network,
+                           str_gap_policy="zero"):
     """Finds timeseries of total load experienced by a node.
 
     Parameters:
@@ -16,6 +17,9 @@ def aggregate_load_of_node(str_load_ID, dict_loads_ts, g_network):
         Container indexable by node-names of load-timeseries at that node.
     g_network : graph
         Directed graph of network-topology of loads.
+    str_gap_policy : str, default="zero"
+        How to treat timestamps missing from some of the loads, see
+        timeseries.add_many.
 
     Returns:
     ----------
@@ -24,23 +28,37 @@ def aggregate_load_of_node(str_load_ID, dict_loads_ts, g_network):
 
     Notes:
     ----------
-    Will calculate recursively, stopping at nodes which have no children which
-    are then treated as customers.
+    Sums the loads of str_load_ID and every node below it one at a time,
+    such that they are never all held at once. Loads of a LoadMatrix are
+    summed directly from its rows, see LoadMatrix.sum_of_load_points.
 
+    """
+    list_IDs = list_IDs_below_node(str_load_ID, dict_loads_ts, g_network)
+    if isinstance(dict_loads_ts, load_points.LoadMatrix):
+        return dict_loads_ts.sum_of_load_points(list_IDs, str_gap_policy)
+    return ts.add_many(
+        (dict_loads_ts[str_ID] for str_ID in list_IDs), str_gap_policy)
+
+
+def list_IDs_below_node(str_load_ID, dict_loads_ts, g_network):
+    """Lists IDs of the loads of a node and all nodes "downstream" to it.
+
+    Notes:
+    ----------
+    Will search recursively, stopping at nodes which have no children which
+    are then treated as customers. Nodes without a load are skipped with a
+    warning.
     """
     if not network.node_in_network(str_load_ID, g_network):
         raise Exception("Error: Node \"" + str_load_ID + "\" missing from network")
     list_children = network.list_children_of_node(str_load_ID, g_network)
 
-    ts_sum = np.empty((0))
+    list_IDs = []
     if str(str_load_ID) in dict_loads_ts:
-        ts_sum = dict_loads_ts[str(str_load_ID)]
+        list_IDs.append(str(str_load_ID))
     else:
         print("Warning: Load-point", str_load_ID, "is missing timeseries!")
-        ts_sum = np.empty((0))
-    if list_children:
-        for str_child in list_children:
-            ts_child = aggregate_load_of_node(
-                str_child, dict_loads_ts, g_network)
-            ts_sum = ts.add_timeseries(ts_sum, ts_child)
-    return ts_sum
\ No newline at end of file
+    for str_child in list_children:
+        list_IDs.extend(list_IDs_below_node(
+            str_child, dict_loads_ts, g_network))
+    return list_IDs
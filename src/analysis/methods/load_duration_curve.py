@@ -1,8 +1,16 @@
 import numpy as np
+import objects.timeseries as timeseries
 
-def create_load_duration_curve(ts):
+def create_load_duration_curve(ts, int_resolution=0, str_reduction="max"):
     """Returns indexed set of loads, sorted by highest = 0.
+
+    Notes
+    ----------
+    The curve is made of the coarsest resampled level of ts with at least
+    int_resolution datapoints, see timeseries.resample_to_resolution, such
+    that indices count e.g. days instead of hours. 0 uses every datapoint.
     """
+    ts = timeseries.resample_to_resolution(ts, int_resolution, str_reduction)
     load_sorted = np.sort(ts[:,1])
     load_sorted = np.flipud(load_sorted)
     idxs = np.arange(0, load_sorted.shape[0])
@@ -4,4 +4,11 @@
 import numpy as np
 
 def find_max_load(ts_load):
-    return np.max(ts_load[:, 1])
\ No newline at end of file
+    return np.max(ts_load[:, 1])
+
+
+def find_max_load_and_index(ts_load):
+    """Returns max load and the index of its datapoint.
+    """
+    int_max_index = int(np.argmax(ts_load[:, 1]))
+    return ts_load[int_max_index, 1], int_max_index
@@ -102,8 +102,19 @@ def encode_directory_contents(str_dir_path, dict_encoding):
     return
 
 
-def format_data_files(dict_data_unsplit, dict_network, str_path_encoding):
+def load_ID_encoding(str_path_encoding):
+    """Loads encoding of customer-ID's from excel-file.
+
+    Parameters
+    ----------
+    str_path_encoding : str
+        Path of excel-file with the columns "old_ID" and "new_ID".
 
+    Returns
+    ----------
+    dict_encoding : dict
+        Pairs of old_ID and new_ID, both as strings.
+    """
     print("Loading encoding...")
     df_encoding = pd.read_excel(str_path_encoding, 0)
     arr_old_ID = np.array(df_encoding["old_ID"])
@@ -111,6 +122,12 @@ def format_data_files(dict_data_unsplit, dict_network, str_path_encoding):
     dict_encoding = {}
     for i in range(len(arr_old_ID)):
         dict_encoding[str(arr_old_ID[i])] = str(arr_new_ID[i])
+    return dict_encoding
+
+
+def format_data_files(dict_data_unsplit, dict_network, str_path_encoding):
+
+    dict_encoding = load_ID_encoding(str_path_encoding)
 
     print("Splitting data-file...")
     str_path = dict_data_unsplit["path"]
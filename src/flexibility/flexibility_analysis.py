@@ -13,7 +13,7 @@ def find_branch_closest_to_overload(loads, network):
         
         ts_agg = load_aggregation.aggregate_load_of_node(
                 fbus, loads, network)
-        if ts_agg != np.array([]): 
+        if ts_agg.size > 0:
             fl_max = float(np.max(ts_agg[:,1]))
             maxs.append((i, rate_A - fl_max, fbus, rate_A))
     return sorted(maxs,key=lambda x: x[1], reverse=False)[0]
@@ -19,14 +19,15 @@ class OverloadEvent:
         fl_energy = 0
         fl_rms_load = 0
         for i in range(1, len(ts_overload_event)):  # Max Riemann-sum
-            fl_max_overload = max(ts_overload_event[i - 1, 1], ts_overload_event[i, 1]) - fl_power_limit
+            # Accumulated as float64, also for single-precision loads
+            fl_max_overload = float(max(ts_overload_event[i - 1, 1], ts_overload_event[i, 1])) - fl_power_limit
             
             # Can be simplified if hour-requirement is assumed
             dt_dur = (ts_overload_event[i, 0] - ts_overload_event[i - 1, 0])
             fl_dur = util.duration_to_hours(dt_dur)
 
             fl_energy += fl_max_overload * fl_dur
-            fl_rms_load += ts_overload_event[i - 1, 1] * fl_dur
+            fl_rms_load += float(ts_overload_event[i - 1, 1]) * fl_dur
         self.fl_MWh = fl_energy
 
         fl_rms_load = fl_rms_load / self.duration_h
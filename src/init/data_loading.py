@@ -1,10 +1,19 @@
 import os
+import re
+import itertools
+import concurrent.futures
 import datetime as dt
 import pandas as pd
 import numpy as np
 import toml
 from objects import timeseries as ts
-from utilities import print_dictionary_recursive
+from objects import load_points
+from init import parse_cache
+import data_formatting
+from utilities import print_dictionary_recursive, LazyDict
+
+# Lower-case markers of missing values in data-columns
+LIST_NAN_MARKERS = ["", "nan", "none", "null", "na", "n/a", "-"]
 
 
 def load_config(str_config_path):
@@ -61,40 +70,69 @@ def load_time_and_data_from_excel(
     Assumes the first row (column) is used for labeling and therefore does not
     load this row (column).
 
+    Vertical data is read only from the time- and data-columns. Columns of
+    mixed objects are returned as strings, while numerical and date-columns
+    keep their type.
+
     The returned arrays are coordinated in the sense that the ith element of
     each array correspond to the same row in the loaded excel-sheet.
     """
     try:
-        df_excel_sheet = pd.read_excel(str_path_excel, int_sheet)
+        if vertical_data:
+            df_excel_sheet = pd.read_excel(
+                str_path_excel, int_sheet, header=None, skiprows=1,
+                usecols=[int_time_column, int_data_column])
+            arr_time = df_excel_sheet[int_time_column].to_numpy()
+            arr_data = df_excel_sheet[int_data_column].to_numpy()
+        else:
+            df_excel_sheet = pd.read_excel(str_path_excel, int_sheet)
+            arr_excel_sheet = np.transpose(np.array(df_excel_sheet))
+            arr_time = arr_excel_sheet[:, int_time_column]
+            arr_data = arr_excel_sheet[:, int_data_column]
     except FileNotFoundError:
         print("File not found, check path in config.toml")
         raise FileNotFoundError
-    arr_excel_sheet = np.array(df_excel_sheet)
-    if not vertical_data:
-        arr_excel_sheet = np.transpose(arr_excel_sheet)
-    arr_time = arr_excel_sheet[:, int_time_column]
-    arr_data = arr_excel_sheet[:, int_data_column]
+    arr_time = parse_cache.storable_array(arr_time)
+    arr_data = parse_cache.storable_array(arr_data)
     return arr_time, arr_data
 
 
-def load_time_and_data_from_txt(
-        str_path_txt,
+def pandas_separator_and_engine(str_separator):
+    """Returns separator and engine for reading a separator with pandas.
+
+    Notes
+    ----------
+    The C-reader only supports single-character separators, longer
+    separators are interpreted as regular expressions by pandas and are
+    therefore escaped.
+    """
+    if len(str_separator) == 1:
+        return str_separator, "c"
+    return re.escape(str_separator), "python"
+
+
+def load_time_and_data_from_delimited(
+        str_path,
         str_separator,
-        int_time_column,
-        int_data_column,
-        vertical_data=True):
-    """Loads time and data-fields from structured txt-file
+        time_column,
+        data_column,
+        vertical_data=True,
+        str_decimal=","):
+    """Loads time and data-fields from delimited text-file (txt or csv).
 
     Parameters
     ----------
-    str_path_txt : str
-        Relative path of txt-file to be loaded.
+    str_path : str
+        Relative path of file to be loaded.
     str_separator : str
         Character or string separating each column.
-    int_time_column, int_data_column : int
-        Column (row) the relevant information occupies. Zero-indexed.
+    time_column, data_column : int or str
+        Column (row) the relevant information occupies. Zero-indexed, or
+        the name of the column in the first row.
     vertical_data, bool, default=True
         Whether the time/data-values occupy rows downwards ("vertical") or not.
+    str_decimal : str, default=","
+        Character used as decimal separator in the data-column.
 
     Returns
     ----------
@@ -103,34 +141,221 @@ def load_time_and_data_from_txt(
     arr_data : np.array
         Array of data-values.
 
+    Raises
+    ----------
+    Exception
+        If columns are selected by name for horizontal data.
+
     Notes
     ----------
-    A structured txt-file will resemble a spreadsheet where str_separator
+    Requires pandas as dependency.
+
+    A structured file will resemble a spreadsheet where str_separator
     delimits columns and newline delimits rows.
 
     Assumes the first row (column) is used for labeling and therefore does not
     load this row (column).
 
+    Vertical data is parsed by the C-reader of pandas, reading only the time-
+    and data-columns. Numerical columns are therefore returned typed (int or
+    float), while columns the reader can not interpret are returned as strings.
+
     The returned arrays are coordinated in the sense that the ith element of
-    each array correspond to the same row in the loaded txt-file.
+    each array correspond to the same row in the loaded file.
     """
-    with open(str_path_txt, 'r') as fp:
-        arr_contents = fp.readlines()
-    for i in range(len(arr_contents)):
-        arr_contents[i] = str.split(str.strip(arr_contents[i]), str_separator)
-    arr_contents = np.array(arr_contents)
+    str_separator, str_engine = pandas_separator_and_engine(str_separator)
+    bool_by_name = isinstance(time_column, str) or isinstance(data_column, str)
+
     if not vertical_data:
-        arr_contents = np.transpose(arr_contents)
-    arr_contents = arr_contents[1:,:]
-    arr_time = arr_contents[:, int_time_column]
-    arr_data = arr_contents[:, int_data_column]
+        if bool_by_name:
+            raise Exception("Horizontal data must be selected by row-number")
+        df_txt = pd.read_csv(
+            str_path, sep=str_separator, header=None, dtype=str,
+            engine=str_engine)
+        arr_contents = np.transpose(df_txt.to_numpy())[1:, :]
+        arr_time = arr_contents[:, time_column]
+        arr_data = arr_contents[:, data_column]
+        return arr_time, arr_data
+
+    if bool_by_name:
+        list_header = list(pd.read_csv(
+            str_path, sep=str_separator, nrows=0, engine=str_engine).columns)
+        if not isinstance(time_column, str):
+            time_column = list_header[time_column]
+        if not isinstance(data_column, str):
+            data_column = list_header[data_column]
+        df_txt = pd.read_csv(
+            str_path, sep=str_separator, header=0,
+            usecols=[time_column, data_column], decimal=str_decimal,
+            engine=str_engine)
+    else:
+        df_txt = pd.read_csv(
+            str_path, sep=str_separator, header=None, skiprows=1,
+            usecols=[time_column, data_column], decimal=str_decimal,
+            engine=str_engine)
+    arr_time = df_txt[time_column].to_numpy()
+    arr_data = df_txt[data_column].to_numpy()
     return arr_time, arr_data
 
 
-def convert_general_time_array_to_datetime_array(
+def load_time_and_data_from_txt(
+        str_path_txt,
+        str_separator,
+        int_time_column,
+        int_data_column,
+        vertical_data=True,
+        str_decimal=","):
+    """Loads time and data-fields from structured txt-file
+
+    See load_time_and_data_from_delimited, decimal-comma is assumed.
+    """
+    return load_time_and_data_from_delimited(
+        str_path_txt, str_separator, int_time_column, int_data_column,
+        vertical_data, str_decimal)
+
+
+def load_time_and_data_from_csv(
+        str_path_csv,
+        str_separator,
+        time_column,
+        data_column,
+        vertical_data=True,
+        str_decimal="."):
+    """Loads time and data-fields from csv-file
+
+    See load_time_and_data_from_delimited, decimal-point is assumed.
+    Columns may be selected by zero-indexed number or by header name.
+
+    Values using the other decimal separator than str_decimal are still
+    loaded correctly by convert_general_data_array_to_float_array, but more
+    slowly.
+    """
+    return load_time_and_data_from_delimited(
+        str_path_csv, str_separator, time_column, data_column,
+        vertical_data, str_decimal)
+
+
+def detect_time_format(arr_time_general, list_time_format):
+    """Finds the first of the given formats the timestamps can be parsed by.
+
+    Parameters
+    ----------
+    arr_time_general : np.array
+        Array of timestamps on any format.
+    list_time_format : list(string)
+        List of possible formats the timestamps are on.
+
+    Returns
+    ----------
+    str_format : str
+        First format in list_time_format matching the first non-empty
+        timestamp.
+
+    Raises
+    ----------
+    Exception
+        If none of the formats match.
+
+    Notes
+    ----------
+    Only a single timestamp is inspected, the format is assumed to hold for
+    the whole array.
+    """
+    str_first_time = None
+    for time_i in arr_time_general:
+        if time_i is not None and time_i == time_i and str(time_i).strip():
+            str_first_time = str(time_i)
+            break
+    if str_first_time is None:
+        raise Exception("Unable to detect date-format of empty time-array")
+
+    for str_format in list_time_format:
+        try:
+            dt.datetime.strptime(str_first_time, str_format)
+            return str_format
+        except ValueError:
+            continue
+    raise Exception("Unable to apply any of the given date-formats")
+
+
+def convert_general_time_array_to_datetime64_array(
         arr_time_general,
         list_time_format,
         str_first_date_iso=""):
+    """Converts array of any time-format to numpy datetime64.
+
+    Parameters
+    ----------
+    arr_time_general : np.arrary
+        Array of timestamps on any format.
+    list_time_format : list(string)
+        List of possible formats the timestamps are on.
+    str_first_date_iso, str, default=""
+        Date of first timestamp, iso format.
+
+    Returns
+    ----------
+    arr_time_dt64 : np.array(datetime64[s])
+        Array of timestamps on datetime64-format.
+
+    Raises
+    ----------
+    Exception
+        If some timestamps can not be parsed by any of the given formats.
+
+    Notes
+    ----------
+    Requires pandas as dependency.
+
+    Hour-offsets are computed as the first date plus an array of offsets.
+    For string-formats the format is detected once from the first timestamp
+    and the whole array is parsed at once. Timestamps not matching the
+    detected format are retried with the remaining formats.
+
+    If list_time_format is a single format, timestamps which can not be parsed
+    are returned as NaT.
+    """
+    arr_time_general = np.asarray(arr_time_general)
+    if arr_time_general.dtype.kind == 'M':
+        return arr_time_general.astype('datetime64[s]')
+
+    if 'H' in list_time_format:
+        dt64_first = np.datetime64(
+            dt.datetime.fromisoformat(str_first_date_iso), 's')
+        arr_offset_h = arr_time_general.astype(np.int64)
+        return dt64_first + arr_offset_h.astype('timedelta64[h]')
+
+    sr_time_str = pd.Series(arr_time_general.astype(str))
+    if not isinstance(list_time_format, list):
+        sr_time_dt = pd.to_datetime(
+            sr_time_str, format=list_time_format, errors="coerce")
+        return sr_time_dt.to_numpy().astype('datetime64[s]')
+
+    str_format = detect_time_format(arr_time_general, list_time_format)
+    arr_time_dt64 = pd.to_datetime(
+        sr_time_str, format=str_format, errors="coerce"
+    ).to_numpy().astype('datetime64[s]')
+
+    list_remaining_formats = [
+        str_other for str_other in list_time_format if str_other != str_format]
+    arr_unparsed = np.isnat(arr_time_dt64)
+    for str_other_format in list_remaining_formats:
+        if not arr_unparsed.any():
+            break
+        arr_time_dt64[arr_unparsed] = pd.to_datetime(
+            sr_time_str[arr_unparsed], format=str_other_format,
+            errors="coerce").to_numpy().astype('datetime64[s]')
+        arr_unparsed = np.isnat(arr_time_dt64)
+    if arr_unparsed.any():
+        raise Exception("Unable to apply any of the given date-formats")
+    return arr_time_dt64
+
+
+def convert_general_time_array_to_datetime_array(
+        arr_time_general,
+        list_time_format,
+        str_first_date_iso="",
+        as_datetime64=False):
     """Converts array of any time-format to python datetime.
 
     Parameters
@@ -141,12 +366,19 @@ def convert_general_time_array_to_datetime_array(
         List of possible formats the timestamps are on.
     str_first_date_iso, str, default=""
         Date of first timestamp, iso format.
+    as_datetime64, bool, default=False
+        Whether to return an array of numpy datetime64 instead, see
+        convert_general_time_array_to_datetime64_array.
 
     Returns
     ----------
     arr_time_dt : np.array(datetime)
         Array of timestamps on datetime-format.
     """
+    if as_datetime64:
+        return convert_general_time_array_to_datetime64_array(
+            arr_time_general, list_time_format, str_first_date_iso)
+
     arr_time_dt = [None] * len(arr_time_general)
     for i in range(len(arr_time_general)):
         if 'H' in list_time_format:
@@ -186,25 +418,247 @@ def convert_general_data_array_to_float_array(arr_data):
     Returns
     ----------
     arr_data_float : np.array(float)
+        Contiguous array of float64.
+
+    Raises
+    ----------
+    ValueError
+        If some values can not be interpreted as numbers.
 
     Notes
     ----------
     Also compensates for use of ',' instead of '.' as decimal separator.
 
+    The whole array is converted at once. Blank values, None and the markers
+    in LIST_NAN_MARKERS are converted to NaN.
     """
-    arr_data_float = [None] * len(arr_data)
-    for i in range(len(arr_data)):
-        data_i = arr_data[i]
-        if isinstance(data_i, float):
-            arr_data_float[i] = data_i
-        elif isinstance(data_i, str):
-            if ',' in data_i:
-                arr_data_float[i] = float(str.replace(data_i, ',', '.'))
-            else:
-                arr_data_float[i] = float(data_i)
-        else:
-            arr_data_float[i] = data_i
-    return arr_data_float
+    arr_data = np.asarray(arr_data)
+    if arr_data.dtype.kind in "biuf":
+        return np.ascontiguousarray(arr_data, dtype=np.float64)
+
+    try:
+        # Object-arrays of only numbers and None/NaN need no string-handling
+        return np.ascontiguousarray(arr_data.astype(np.float64))
+    except (TypeError, ValueError):
+        pass
+
+    arr_data_str = np.char.strip(arr_data.astype(str))
+    arr_data_str = np.char.replace(arr_data_str, ',', '.')
+    arr_missing = np.isin(np.char.lower(arr_data_str), LIST_NAN_MARKERS)
+    arr_data_str[arr_missing] = "nan"
+    return np.ascontiguousarray(arr_data_str.astype(np.float64))
+
+
+def load_time_and_data_from_file(str_path, dict_data_config):
+    """Loads time and data-fields from a single data-file, using the cache.
+
+    Parameters
+    ----------
+    str_path : str
+        Path of the file to be loaded.
+    dict_data_config : dict
+        Structured dictionary containing at least how the timestamps are
+        formatted, the date of the first timestamp and the fields required
+        by the filetype of str_path.
+
+    Returns
+    ----------
+    arr_time_dt64 : np.array(datetime64[s])
+        Array of timestamps.
+    arr_data : np.array(float)
+        Array of data-values.
+
+    Notes
+    ----------
+    Parsed arrays are cached in the directory given by the optional field
+    "cache_path", defaulting to parse_cache.STR_DEFAULT_CACHE_PATH. An empty
+    string disables the cache. Cached arrays are only used as long as neither
+    the data-file nor its parse-settings have changed.
+
+    Kept at module-level so it may be dispatched to worker-processes, the
+    typed return-values are cheap to send between processes.
+    """
+    str_cache_path = dict_data_config.get(
+        "cache_path", parse_cache.STR_DEFAULT_CACHE_PATH)
+    if not str_cache_path:
+        return parse_time_and_data_from_file(str_path, dict_data_config)
+
+    str_fingerprint = parse_cache.fingerprint_file(str_path, dict_data_config)
+    dict_cached = parse_cache.load_cached_arrays(
+        str_cache_path, str_path, str_fingerprint)
+    if dict_cached is not None:
+        print("Loading", str_path, "from cache...")
+        return dict_cached["time"], dict_cached["data"]
+
+    arr_time_dt64, arr_data = parse_time_and_data_from_file(
+        str_path, dict_data_config)
+    parse_cache.store_cached_arrays(
+        str_cache_path, str_path, str_fingerprint,
+        time=arr_time_dt64, data=arr_data)
+    return arr_time_dt64, arr_data
+
+
+def parse_time_and_data_from_file(str_path, dict_data_config):
+    """Parses and converts time and data-fields from a single data-file.
+
+    Parameters
+    ----------
+    str_path : str
+        Path of the file to be loaded.
+    dict_data_config : dict
+        Structured dictionary containing at least how the timestamps are
+        formatted, the date of the first timestamp and the fields required
+        by the filetype of str_path.
+
+    Returns
+    ----------
+    arr_time_dt64 : np.array(datetime64[s])
+        Array of timestamps.
+    arr_data : np.array(float)
+        Array of data-values.
+    """
+    print("Loading", str_path + "...")
+    str_data_date_format = dict_data_config["date_format"]
+    str_data_first_date_iso = dict_data_config["first_date_iso"]
+    _str_data_filename, str_data_filetype = os.path.splitext(str_path)
+
+    if str_data_filetype == ".xlsx" or str_data_filetype == ".xls":
+        int_sheet = dict_data_config["sheet"]
+        int_time_column = dict_data_config["time_column"]
+        int_data_column = dict_data_config["data_column"]
+        bool_vertical_data = dict_data_config["vertical_data"]
+
+        arr_time, arr_data = load_time_and_data_from_excel(
+            str_path, int_sheet,
+            int_time_column, int_data_column, bool_vertical_data)
+
+    elif str_data_filetype == ".txt":
+        str_separator = dict_data_config["separator"]
+        int_time_column = dict_data_config["time_column"]
+        int_data_column = dict_data_config["data_column"]
+        bool_vertical_data = dict_data_config["vertical_data"]
+
+        arr_time, arr_data = load_time_and_data_from_txt(
+            str_path, str_separator,
+            int_time_column, int_data_column, bool_vertical_data,
+            dict_data_config.get("decimal", ","))
+
+    elif str_data_filetype == ".csv":
+        str_separator = dict_data_config.get("separator", ",")
+        time_column = dict_data_config["time_column"]
+        data_column = dict_data_config["data_column"]
+        bool_vertical_data = dict_data_config.get("vertical_data", True)
+
+        arr_time, arr_data = load_time_and_data_from_csv(
+            str_path, str_separator,
+            time_column, data_column, bool_vertical_data,
+            dict_data_config.get("decimal", "."))
+
+    # elif str_data_filetype == ".example"
+    #   Code for additional formats
+
+    arr_time_dt64 = convert_general_time_array_to_datetime_array(
+        arr_time, str_data_date_format, str_data_first_date_iso,
+        as_datetime64=True)
+    arr_data = convert_general_data_array_to_float_array(arr_data)
+    return arr_time_dt64, arr_data
+
+
+def stream_unsplit_txt_into_load_matrix(dict_data_config):
+    """Loads unsplit txt-file of many load-points directly into load-matrix.
+
+    Parameters
+    ----------
+    dict_data_config : dict
+        Structured dictionary containing the fields of a txt-file as well as
+        the column of the ID's ("ID_column") and the date of the last
+        timestamp ("last_date_iso").
+
+    Returns
+    ----------
+    lm_loads : LoadMatrix
+        Loads keyed by (encoded) ID, on an hourly time-axis from the first
+        to the last date.
+
+    Notes
+    ----------
+    Alternative to splitting the file with data_formatting.split_txt_by_ID
+    and loading the split directory. The file is read in chunks of
+    "chunk_rows" rows (default 100000), such that memory-use is bounded by
+    the load-matrix itself, which may be memory-mapped through
+    "backing_file". Decimals are separated by "decimal", defaulting to ",",
+    as for other txt-files.
+
+    If "encoding_path" is given, ID's are encoded as by
+    data_formatting.load_ID_encoding and rows of ID's missing from the
+    encoding are skipped. Rows with timestamps outside the time-axis are
+    skipped as well.
+    """
+    str_path = dict_data_config["path"]
+    str_separator, str_engine = pandas_separator_and_engine(
+        dict_data_config["separator"])
+    int_ID_column = dict_data_config["ID_column"]
+    int_time_column = dict_data_config["time_column"]
+    int_data_column = dict_data_config["data_column"]
+    str_data_date_format = dict_data_config["date_format"]
+    str_data_first_date_iso = dict_data_config["first_date_iso"]
+    int_chunk_rows = dict_data_config.get("chunk_rows", 100000)
+
+    dict_ID_encoding = None
+    if dict_data_config.get("encoding_path", ""):
+        dict_ID_encoding = data_formatting.load_ID_encoding(
+            dict_data_config["encoding_path"])
+
+    arr_time_axis = ts.create_hourly_time_axis(
+        dt.date.fromisoformat(str_data_first_date_iso),
+        dt.date.fromisoformat(dict_data_config["last_date_iso"]))
+    lm_loads = load_points.LoadMatrix(
+        arr_time_axis, load_points.load_dtype(dict_data_config),
+        str_backing_path=dict_data_config.get("backing_file", ""))
+
+    print("Streaming", str_path, "into load-matrix...")
+    set_skipped_IDs = set()
+    int_skipped_rows = 0
+    with pd.read_csv(
+            str_path, sep=str_separator, header=None, skiprows=1,
+            usecols=[int_ID_column, int_time_column, int_data_column],
+            dtype={int_ID_column: str},
+            decimal=dict_data_config.get("decimal", ","), engine=str_engine,
+            chunksize=int_chunk_rows) as reader:
+        for df_chunk in reader:
+            sr_IDs = df_chunk[int_ID_column].str.strip()
+            if dict_ID_encoding is not None:
+                sr_encoded_IDs = sr_IDs.map(dict_ID_encoding)
+                set_skipped_IDs.update(sr_IDs[sr_encoded_IDs.isna()])
+                sr_IDs = sr_encoded_IDs
+
+            arr_time_dt64 = convert_general_time_array_to_datetime_array(
+                df_chunk[int_time_column].to_numpy(), str_data_date_format,
+                str_data_first_date_iso, as_datetime64=True)
+            arr_data = convert_general_data_array_to_float_array(
+                df_chunk[int_data_column].to_numpy())
+
+            arr_columns = np.searchsorted(arr_time_axis, arr_time_dt64)
+            arr_columns[arr_columns == len(arr_time_axis)] = 0
+            arr_valid = ((arr_time_axis[arr_columns] == arr_time_dt64)
+                         & sr_IDs.notna().to_numpy())
+            int_skipped_rows += np.count_nonzero(~arr_valid)
+
+            sr_valid_IDs = sr_IDs[arr_valid]
+            dict_rows = {str_ID: lm_loads.get_or_add_row(str_ID)
+                         for str_ID in sr_valid_IDs.unique()}
+            arr_rows = sr_valid_IDs.map(dict_rows).to_numpy(dtype=np.int64)
+            lm_loads.arr_loads[arr_rows, arr_columns[arr_valid]] = \
+                arr_data[arr_valid]
+
+    if set_skipped_IDs:
+        print("Skipped the following customers missing from encoding:")
+        print(sorted(set_skipped_IDs))
+    if int_skipped_rows:
+        print("Warning: Skipped", int_skipped_rows,
+              "rows missing from encoding or outside of time-axis!")
+    lm_loads.flush()
+    return lm_loads
 
 
 def load_data_and_create_timeseries(dict_data_config):
@@ -224,14 +678,33 @@ def load_data_and_create_timeseries(dict_data_config):
     Notes
     ----------
     Main functionality of this module.
+
+    The optional field "workers" sets how many processes parse the files of
+    the directory concurrently. Defaults to 1, which loads all files in the
+    current process, while 0 uses one process per CPU. Files are loaded in
+    sorted order regardless of the amount of workers.
+
+    If "lazy_loading" is set, a LazyDict is returned instead, which loads
+    each file on first access.
+
+    If "ID_column" is given, the path is instead an unsplit txt-file of many
+    load-points, see stream_unsplit_txt_into_load_matrix.
+
+    If "single_precision" is set, the data is stored as float32, see
+    load_points.load_dtype.
     """
     str_data_path = dict_data_config["path"]
-    str_data_date_format = dict_data_config["date_format"]
-    str_data_first_date_iso = dict_data_config["first_date_iso"]
+    if "ID_column" in dict_data_config:
+        return stream_unsplit_txt_into_load_matrix(dict_data_config)
+
+    dtype = load_points.load_dtype(dict_data_config)
+    int_workers = dict_data_config.get("workers", 1)
+    if not int_workers:
+        int_workers = os.cpu_count()
 
     list_paths_to_be_loaded = []
     if os.path.isdir(str_data_path):
-        for str_file_path in os.listdir(str_data_path):
+        for str_file_path in sorted(os.listdir(str_data_path)):
             list_paths_to_be_loaded.append(str_data_path + str_file_path)
     else:
         raise(Exception("Directory \"" + str_data_path +"\" does not exist!"))
@@ -241,48 +714,45 @@ def load_data_and_create_timeseries(dict_data_config):
         # require all data-files to be stored in a directory.
         # This change means temperature-data now must be stored in a directory.
 
-    dict_loaded_ts = {}
+    dict_paths = {}
     for str_path in list_paths_to_be_loaded:
-        print("Loading", str_path + "...")
-        _str_data_filename, str_data_filetype = os.path.splitext(str_path)
-
-        if str_data_filetype == ".xlsx" or str_data_filetype == ".xls":
-            int_sheet = dict_data_config["sheet"]
-            int_time_column = dict_data_config["time_column"]
-            int_data_column = dict_data_config["data_column"]
-            bool_vertical_data = dict_data_config["vertical_data"]
-
-            arr_time, arr_data = load_time_and_data_from_excel(
-                str_path, int_sheet,
-                int_time_column, int_data_column, bool_vertical_data)
-
-        elif str_data_filetype == ".txt":
-            str_separator = dict_data_config["separator"]
-            int_time_column = dict_data_config["time_column"]
-            int_data_column = dict_data_config["data_column"]
-            bool_vertical_data = dict_data_config["vertical_data"]
-
-            arr_time, arr_data = load_time_and_data_from_txt(
-                str_path, str_separator,
-                int_time_column, int_data_column, bool_vertical_data)
-
-        elif str_data_filetype == ".csv":
-            raise Exception("Not yet implemented")
-
-        # elif str_data_filetype == ".example"
-        #   Code for additional formats
-
-        arr_time_dt = convert_general_time_array_to_datetime_array(
-            arr_time, str_data_date_format, str_data_first_date_iso)
-        arr_data = convert_general_data_array_to_float_array(arr_data)
-
-        ts_data = ts.create_standard_time_series(arr_time_dt, arr_data)
-
         if os.path.isdir(str_data_path):
             str_key_name, _temp = os.path.splitext(
                 str_path.replace(str_data_path, ""))
         else:
             str_key_name = str_data_path
+        dict_paths[str_key_name] = str_path
+
+    if dict_data_config.get("lazy_loading", ""):
+        def fn_load_timeseries(str_key_name):
+            arr_time_dt64, arr_data = load_time_and_data_from_file(
+                dict_paths[str_key_name], dict_data_config)
+            return ts.create_standard_time_series(
+                arr_time_dt64, arr_data, dtype)
+
+        return LazyDict(list(dict_paths), fn_load_timeseries)
+
+    if int_workers > 1 and len(list_paths_to_be_loaded) > 1:
+        print("Loading", len(list_paths_to_be_loaded), "files using",
+              int_workers, "processes...")
+        int_chunksize = max(
+            1, len(list_paths_to_be_loaded) // (4 * int_workers))
+        with concurrent.futures.ProcessPoolExecutor(int_workers) as executor:
+            list_loaded = list(executor.map(
+                load_time_and_data_from_file,
+                list_paths_to_be_loaded,
+                itertools.repeat(dict_data_config),
+                chunksize=int_chunksize))
+    else:
+        list_loaded = [
+            load_time_and_data_from_file(str_path, dict_data_config)
+            for str_path in list_paths_to_be_loaded]
+
+    dict_loaded_ts = {}
+    for str_key_name, (arr_time_dt64, arr_data) in zip(
+            dict_paths, list_loaded):
+        ts_data = ts.create_standard_time_series(
+            arr_time_dt64, arr_data, dtype)
         dict_loaded_ts[str_key_name] = ts_data
 
     return dict_loaded_ts
@@ -0,0 +1,212 @@
+"""Module for caching parsed data-files on disk.
+
+Notes
+----------
+Each data-file has one cache-entry of each kind, named from the absolute path
+of the data-file and stored as an uncompressed .npz-file in the
+cache-directory. Parsed timeseries-arrays are stored without suffix, and
+are the only parsed data which is cached, such that every loader shares
+the same entries.
+
+Every entry stores a fingerprint of the data-file (path, size and time of
+last modification) together with the config-fields which affect parsing.
+An entry whose fingerprint does not match the current data-file and config
+is treated as missing and overwritten on the next store, such that changing
+either the data-file or the parse-settings invalidates the cache.
+
+Results derived from parsed data, such as the historical normal temperature,
+are stored as entries of the data-file under their own suffix, with the
+fingerprint of the data-file, such that they are invalidated along with the
+parsed arrays.
+
+Only arrays of non-object dtype are stored, so entries can be loaded without
+pickling.
+"""
+import os
+import json
+import hashlib
+import numpy as np
+
+STR_DEFAULT_CACHE_PATH = "out_data/cache/"
+
+# Bump when the parsing changes in a way which makes old entries invalid
+INT_CACHE_VERSION = 1
+
+# Fields of a [data.*]-section which affect the parsed arrays
+LIST_PARSE_CONFIG_FIELDS = [
+    "date_format",
+    "first_date_iso",
+    "separator",
+    "decimal",
+    "sheet",
+    "time_column",
+    "data_column",
+    "vertical_data",
+]
+
+
+def fingerprint_file(str_path, dict_data_config):
+    """Creates fingerprint of a data-file and the settings it is parsed with.
+
+    Parameters
+    ----------
+    str_path : str
+        Path of data-file.
+    dict_data_config : dict
+        Config-section the data-file is loaded with.
+
+    Returns
+    ----------
+    str_fingerprint : str
+        Hex-digest identifying the data-file and parse-settings.
+    """
+    stat_file = os.stat(str_path)
+    dict_fingerprint = {
+        "version": INT_CACHE_VERSION,
+        "path": os.path.abspath(str_path),
+        "size": stat_file.st_size,
+        "mtime": stat_file.st_mtime_ns,
+        "config": {str_field: dict_data_config[str_field]
+                   for str_field in LIST_PARSE_CONFIG_FIELDS
+                   if str_field in dict_data_config},
+    }
+    str_fingerprint = json.dumps(dict_fingerprint, sort_keys=True, default=str)
+    return hashlib.sha1(str_fingerprint.encode()).hexdigest()
+
+
+def fingerprint_arrays(*arrays):
+    """Creates fingerprint of the contents of arrays.
+
+    Parameters
+    ----------
+    *arrays : np.array
+        Arrays a cached result is derived from. Must not be of object dtype.
+
+    Returns
+    ----------
+    str_fingerprint : str
+        Hex-digest identifying the dtype, shape and values of the arrays.
+    """
+    hash_arrays = hashlib.sha1(str(INT_CACHE_VERSION).encode())
+    for arr in arrays:
+        arr = np.ascontiguousarray(arr)
+        hash_arrays.update((str(arr.dtype) + str(arr.shape)).encode())
+        hash_arrays.update(arr.tobytes())
+    return hash_arrays.hexdigest()
+
+
+def cache_entry_path(str_cache_path, str_path, str_suffix=""):
+    """Returns path of the cache-entry belonging to a data-file.
+
+    Notes
+    ----------
+    str_suffix separates several kinds of entries of the same data-file.
+    """
+    str_name = hashlib.sha1(os.path.abspath(str_path).encode()).hexdigest()
+    return os.path.join(str_cache_path, str_name + str_suffix + ".npz")
+
+
+def load_cached_arrays(str_cache_path, str_path, str_fingerprint,
+                       str_suffix=""):
+    """Loads cached arrays of a data-file.
+
+    Parameters
+    ----------
+    str_cache_path : str
+        Directory of the cache.
+    str_path : str
+        Path of the data-file the arrays were parsed from.
+    str_fingerprint : str
+        Current fingerprint of the data-file, see fingerprint_file.
+    str_suffix : str, default=""
+        Kind of entry, see cache_entry_path.
+
+    Returns
+    ----------
+    dict_arrays : dict(np.array)
+        Cached arrays keyed by name.
+    None
+        If the entry is missing, unreadable or stale.
+    """
+    return load_cache_entry(
+        cache_entry_path(str_cache_path, str_path, str_suffix),
+        str_fingerprint)
+
+
+def load_cache_entry(str_entry_path, str_fingerprint):
+    """Loads arrays of a cache-entry, see load_cached_arrays.
+
+    Notes
+    ----------
+    Used directly for entries which do not belong to a data-file, such as
+    the stages of init.preprocessing.
+    """
+    if not os.path.isfile(str_entry_path):
+        return None
+    try:
+        with np.load(str_entry_path, allow_pickle=False) as npz_entry:
+            if str(npz_entry["fingerprint"]) != str_fingerprint:
+                return None
+            dict_arrays = {key: npz_entry[key] for key in npz_entry.files
+                           if key != "fingerprint"}
+    except (OSError, ValueError, KeyError):
+        print("Warning: Ignoring unreadable cache-entry", str_entry_path)
+        return None
+    return dict_arrays
+
+
+def store_cached_arrays(str_cache_path, str_path, str_fingerprint,
+                        str_suffix="", **arrays):
+    """Stores arrays parsed from a data-file in the cache.
+
+    Parameters
+    ----------
+    str_cache_path : str
+        Directory of the cache. Created if missing.
+    str_path : str
+        Path of the data-file the arrays were parsed from.
+    str_fingerprint : str
+        Current fingerprint of the data-file, see fingerprint_file.
+    str_suffix : str, default=""
+        Kind of entry, see cache_entry_path.
+    **arrays : np.array
+        Arrays to store, keyed by name. Must not be of object dtype.
+
+    Notes
+    ----------
+    The entry is written to a temporary file and then moved in place, such
+    that concurrent loaders never read a partially written entry.
+    """
+    os.makedirs(str_cache_path, exist_ok=True)
+    store_cache_entry(
+        cache_entry_path(str_cache_path, str_path, str_suffix),
+        str_fingerprint, **arrays)
+    return
+
+
+def store_cache_entry(str_entry_path, str_fingerprint, **arrays):
+    """Stores arrays as a cache-entry, see store_cached_arrays.
+
+    Notes
+    ----------
+    The directory of str_entry_path must exist.
+    """
+    str_tmp_path = str_entry_path + "." + str(os.getpid()) + ".tmp"
+    with open(str_tmp_path, 'wb') as fp:
+        np.savez(fp, fingerprint=np.array(str_fingerprint), **arrays)
+    os.replace(str_tmp_path, str_entry_path)
+    return
+
+
+def storable_array(arr):
+    """Converts array of objects to strings, such that it can be cached.
+
+    Notes
+    ----------
+    Values are converted by str(), which is also how the conversions of
+    init.data_loading interpret objects.
+    """
+    arr = np.asarray(arr)
+    if arr.dtype == object:
+        return arr.astype(str)
+    return arr
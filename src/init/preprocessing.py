@@ -1,38 +1,45 @@
+import os
+import json
+import time
+import hashlib
 import numpy as np
+import objects.timeseries as ts
+from init import parse_cache
 
 
-def remove_nan_and_none_datapoints(ts_data):
+def remove_nan_and_none_datapoints(ts_data, bool_return_mask=False):
     """Removes datapoints containing NaN or None.
 
     Parameters
     ----------
-    dict_data_ts : dict(timeseries)
-        Dictionary of all timeseries to remove NaN and None from.
+    ts_data : Timeseries
+        Timeseries to remove NaN and None from.
+    bool_return_mask : bool, default=False
+        Whether to also return which datapoints were kept.
 
     Returns
     ----------
-    dict_data_ts : dict(timeseries)
-        Dictionary of all timeseries without NaN and None-values.
+    ts_data : Timeseries
+        Timeseries without NaN and None-values.
+    arr_valid : np.array(bool)
+        Mask of the kept datapoints of the input timeseries, only returned
+        if bool_return_mask is set.
+
+    Notes
+    ----------
+    None is stored as NaN in the data-values and NaT in the timestamps, so
+    both are found by one vectorized pass over each column.
     """
     print("Removing NaN and None datapoints...")
-    
-    list_good_indeces = []
-    for dp in ts_data:
-        dp = list(dp)
-        if (not None in dp) and (dp == dp):
-            list_good_indeces.append(True)
-        else:
-            list_good_indeces.append(False)
-    ts_data = ts_data[list_good_indeces]
+    arr_valid = ~(np.isnat(ts_data[:, 0]) | np.isnan(ts_data[:, 1]))
+    int_dropped = len(arr_valid) - np.count_nonzero(arr_valid)
+    print("Removed", int_dropped, "of", len(arr_valid), "datapoints")
+    ts_data = ts_data[arr_valid]
+    if bool_return_mask:
+        return ts_data, arr_valid
     return ts_data
 
 
-def datetime_to_yearless_iso_string(dt):
-    """Converts datetime-object to string of date without year on iso format.
-    """
-    return dt.isoformat()[5:10]
-
-
 def compute_daily_historical_normal(ts_daily_data_historical):
     """Computes daily average value over historical timeseries.
 
@@ -43,91 +50,255 @@ def compute_daily_historical_normal(ts_daily_data_historical):
 
     Returns
     ----------
-    dict_daily_average : dict
-        Dictionary of daily historical averages. Keys are yearless dates on
-        iso format. 
+    arr_daily_average : np.array(float)
+        Daily historical averages indexed by day of leap-year, see
+        day_of_leap_year. NaN for days missing from the timeseries.
 
     Notes
     ----------
     Function assumes timeseries is at most of daily frequency.
 
-    The function does not guarantee the output dictionary is chronologically 
-    ordered.
-    Example: Datasets which begin at non-leapyears will have "02-29" as the 
-    last entry in the output dictionary.
+    Datapoints are grouped by day of leap-year, such that 02-29 is only
+    averaged over leap-years. If no leap-day is present in the timeseries,
+    02-29 is instead given the mean of the normals of 02-28 and 03-01.
+
+    Other days missing from the timeseries are warned about, and raise in
+    temperature_deviation_of_timestamps if a load falls on them.
     """
-    dict_running_sum_and_count = {}
-    for i in range(len(ts_daily_data_historical)):
-        arr_cur_data = ts_daily_data_historical[i, :]
-        str_date_yearless = datetime_to_yearless_iso_string(arr_cur_data[0])
-        flt_cur_sum = dict_running_sum_and_count.get(
-            str_date_yearless, [0, 0])[0]
-        int_cur_count = dict_running_sum_and_count.get(
-            str_date_yearless, [0, 0])[1]
-        list_new_sum_and_count = [flt_cur_sum + arr_cur_data[1],
-                                  int_cur_count + 1]
-        dict_running_sum_and_count[str_date_yearless] = list_new_sum_and_count
-
-    dict_daily_average = {}
-    for key in dict_running_sum_and_count:
-        dict_daily_average[key] = dict_running_sum_and_count[key][0] / \
-            dict_running_sum_and_count[key][1]
-    return dict_daily_average
-
-
-def create_n_day_average_dict(ts_basis, date_start, date_end,  n):
-    """Computes backwards n-day average at every point of input timeseries.
+    arr_day = day_of_leap_year(ts_daily_data_historical[:, 0])
+    arr_sum = np.bincount(arr_day, weights=ts_daily_data_historical[:, 1],
+                          minlength=366)
+    arr_count = np.bincount(arr_day, minlength=366)
+    arr_daily_average = np.full(366, np.nan)
+    np.divide(arr_sum, arr_count, out=arr_daily_average,
+              where=arr_count > 0)
+    if not arr_count[INT_LEAP_DAY]:
+        arr_daily_average[INT_LEAP_DAY] = (
+            arr_daily_average[INT_LEAP_DAY - 1]
+            + arr_daily_average[INT_LEAP_DAY + 1]) / 2
+    int_missing_days = np.count_nonzero(np.isnan(arr_daily_average))
+    if int_missing_days:
+        print("Warning: Historical data is missing", int_missing_days,
+              "days of the year, their normal is unknown!")
+    return arr_daily_average
+
+
+def load_or_compute_daily_historical_normal(
+        ts_daily_data_historical, str_cache_path, str_path, dict_data_config):
+    """Computes daily historical normal, using the cache of parsed data.
+
+    Parameters
+    ----------
+    ts_daily_data_historical : timeseries
+        Historical daily data to compute daily normal over.
+    str_cache_path : str
+        Directory of the cache, an empty string disables the cache.
+    str_path : str
+        Path of the data-file the timeseries was loaded from. The normal is
+        stored as an entry of this file, see init.parse_cache.
+    dict_data_config : dict
+        Config-section the data-file is loaded with.
+
+    Returns
+    ----------
+    arr_daily_average : np.array(float)
+        See compute_daily_historical_normal.
+
+    Notes
+    ----------
+    The entry is fingerprinted like the parsed arrays of the data-file, see
+    parse_cache.fingerprint_file, so it is recomputed whenever the data-file
+    or its parse-settings change, without hashing the timeseries.
+    """
+    if not str_cache_path:
+        return compute_daily_historical_normal(ts_daily_data_historical)
+
+    str_fingerprint = parse_cache.fingerprint_file(str_path, dict_data_config)
+    dict_cached = parse_cache.load_cached_arrays(
+        str_cache_path, str_path, str_fingerprint, "_normal")
+    if dict_cached is not None:
+        print("Loading normal temperature from cache...")
+        return dict_cached["normal"]
+
+    arr_daily_average = compute_daily_historical_normal(
+        ts_daily_data_historical)
+    parse_cache.store_cached_arrays(
+        str_cache_path, str_path, str_fingerprint, "_normal",
+        normal=arr_daily_average)
+    return arr_daily_average
+
+
+def rolling_average_of_timestamps(ts_basis, arr_time, n, arr_weights=None):
+    """Computes backwards n-day average of daily timeseries at timestamps.
 
     Parameters
     -----------
     ts_basis : timeseries
-        Timeseries to calculate average over daily datapoints.
-    dt_start : datetime
-        First date to calculate from.
-    dt_end : datetime
-        Last date to calculate to (inclusive)
+        Timeseries of daily datapoints to calculate average over.
+    arr_time : np.array(datetime64)
+        Timestamps to calculate average at, typically the hourly load-grid.
     n : int
-        Amount of days to take backwards average over.
+        Amount of days to take backwards average over, including the date
+        of the timestamp.
+    arr_weights : np.array(float), optional
+        Weight of each day of the window, starting with the date of the
+        timestamp and going backwards. Must be of length n. Defaults to
+        equal weights.
 
     Returns
     -----------
-    dict_averages : dict
-        n-day backwards averages, keyed by date.
+    arr_averages : np.array(float)
+        n-day backwards average of the date of every timestamp, aligned
+        with arr_time.
 
     Notes
     ----------
-    Contents of return will always be a chronologically sorted dict as long as
-    ts_basis is sorted.
+    ts_basis must be sorted and contain one datapoint per day, the window
+    is taken over the n datapoints up to and including the date.
+
+    Only the days covered by arr_time and the n-1 days before are used,
+    and are located by binary search. Equally weighted averages are then
+    found as differences of a cumulative sum, other weightings by
+    convolution with the weights.
     """
-    int_starting_index = 0
-    while int_starting_index < len(ts_basis):
-        if ts_basis[int_starting_index][0].date() == date_start:
-            break
-        else:
-            int_starting_index += 1
+    if arr_weights is not None and len(arr_weights) != n:
+        raise(Exception("Amount of weights must equal window length"))
+    arr_basis_date = ts_basis[:, 0].astype("datetime64[D]")
+    arr_date = np.asarray(arr_time).astype("datetime64[D]")
+
+    int_start = np.searchsorted(arr_basis_date, arr_date.min())
+    int_end = np.searchsorted(arr_basis_date, arr_date.max())
+    if int_start == len(arr_basis_date) \
+            or arr_basis_date[int_start] != arr_date.min():
+        raise(Exception("Start date missing from basis-timeseries"))
+    if int_end == len(arr_basis_date) \
+            or arr_basis_date[int_end] != arr_date.max():
+        raise(Exception("End date missing from basis-timeseries"))
+    if int_start < n - 1:
+        raise(Exception("Basis-timeseries lacks the " + str(n - 1)
+                        + " days before start date"))
+
+    arr_window_values = ts_basis[:, 1][int_start - n + 1:int_end + 1]
+    if arr_weights is None:
+        arr_cumulative = np.concatenate(([0], np.cumsum(arr_window_values)))
+        arr_daily_averages = (arr_cumulative[n:] - arr_cumulative[:-n]) / n
+    else:
+        arr_weights = np.asarray(arr_weights, dtype=float)
+        arr_daily_averages = np.convolve(
+            arr_window_values, arr_weights, "valid") / arr_weights.sum()
 
-    dict_averages = {}
-    while int_starting_index < len(ts_basis):
-        fl_running_sum = 0
-        i = 0
-        while i < n:
-            fl_running_sum += ts_basis[int_starting_index - i][1]
-            i += 1
+    arr_index = np.searchsorted(arr_basis_date[int_start:int_end + 1],
+                                arr_date)
+    if (arr_basis_date[int_start:int_end + 1][arr_index] != arr_date).any():
+        raise(Exception("Dates missing from basis-timeseries"))
+    return arr_daily_averages[arr_index]
 
-        dt_cur_date = ts_basis[int_starting_index][0].date()
-        dict_averages[dt_cur_date] = fl_running_sum / n
 
-        if dt_cur_date == date_end:
-            return dict_averages
-        else:
-            int_starting_index += 1
-    raise(Exception("End date missing from basis-timeseries"))
+# Day of leap-year of 02-29, see day_of_leap_year
+INT_LEAP_DAY = 59
+
+
+def day_of_leap_year(arr_time):
+    """Returns index of the date of every timestamp within a leap-year.
+
+    Parameters
+    ----------
+    arr_time : np.array(datetime64)
+        Timestamps.
+
+    Returns
+    ----------
+    arr_day : np.array(int)
+        Zero-indexed day of year the date would have in a leap-year, such
+        that the same date of every year has the same index, and 02-29 is
+        day 59.
+    """
+    arr_date = np.asarray(arr_time).astype("datetime64[D]")
+    arr_year = arr_date.astype("datetime64[Y]")
+    arr_day = (arr_date - arr_year.astype("datetime64[D]")).astype(np.int64)
+    arr_year_number = arr_year.astype(np.int64) + 1970
+    arr_leap = ((arr_year_number % 4 == 0) & (arr_year_number % 100 != 0)) \
+        | (arr_year_number % 400 == 0)
+    # Days from 03-01 of non-leap-years are shifted past 02-29
+    arr_day[~arr_leap & (arr_day >= INT_LEAP_DAY)] += 1
+    return arr_day
+
+
+def temperature_deviation_of_timestamps(
+        arr_time,
+        arr_daily_normal_temperature,
+        ts_temperature_n_day_average):
+    """Returns deviation of normal temperature from n-day average temperature.
+
+    Parameters
+    -----------
+    arr_time : np.array(datetime64)
+        Timestamps to find deviation at.
+    arr_daily_normal_temperature : np.array(float)
+        Normal temperature indexed by day of leap-year, see
+        compute_daily_historical_normal.
+    ts_temperature_n_day_average : Timeseries
+        n-day average temperature on the hourly load-grid, see
+        rolling_average_of_timestamps.
+
+    Returns
+    -----------
+    arr_deviation : np.array(float)
+        Normal minus n-day average temperature at every timestamp.
+
+    Notes
+    -----------
+    The normal temperature is gathered by day of leap-year, the n-day
+    average by position of the timestamp on the load-grid.
+    """
+    arr_time = np.asarray(arr_time).astype("datetime64[h]")
+    arr_average_time = ts_temperature_n_day_average[:, 0]
+    arr_index = np.searchsorted(arr_average_time, arr_time)
+    if (arr_index == len(arr_average_time)).any() \
+            or (arr_average_time[np.minimum(
+                arr_index, len(arr_average_time) - 1)] != arr_time).any():
+        raise(Exception("Timestamps of load missing from n-day average temperature"))
+    arr_Tn = arr_daily_normal_temperature[day_of_leap_year(arr_time)]
+    if np.isnan(arr_Tn).any():
+        raise(Exception("Normal temperature unknown for dates of load, "
+                        + "historical temperature is missing these days"))
+    arr_Ti = ts_temperature_n_day_average[:, 1][arr_index]
+    return arr_Tn - arr_Ti
+
+
+def correct_for_temperature_deviations(arr_loads, arr_deviation, k, x):
+    """Applies temperature-correction to loads.
+
+    Parameters
+    -----------
+    arr_loads : np.array(float)
+        Loads, either one load-point or one row per load-point, with one
+        column per element of arr_deviation.
+    arr_deviation : np.array(float)
+        Temperature deviation, see temperature_deviation_of_timestamps.
+    k, x : float
+        Parameters in temperature-correction, see
+        correct_load_for_temperature_deviations.
+
+    Returns
+    -----------
+    arr_loads_corrected : np.array(float)
+        Corrected loads of the same shape as arr_loads.
+
+    Notes
+    -----------
+    The deviation is shared by all rows, so a whole load-matrix is corrected
+    at once.
+    """
+    # Removed, but should in theory be performed according to Tønne
+    # arr_deviation = np.where(winter months, arr_deviation, 0)
+    return arr_loads + arr_loads*k*x*arr_deviation
 
 
 def correct_load_for_temperature_deviations(
         ts_load, 
-        dict_daily_normal_temperature,
-        dict_temperature_n_day_average,
+        arr_daily_normal_temperature,
+        ts_temperature_n_day_average,
         k, x):
     """Performs temperature-correction of load-timeseries based on historical
     temperature measurements.
@@ -137,43 +308,350 @@ def correct_load_for_temperature_deviations(
 
     Parameters
     -----------
-    dict_data_ts : dict(timeseries)
-        Dictionary containing at least the timeseries of load, temperature-
-        measurements for the same period and historical temperature-measurements.
+    ts_load : Timeseries
+        Load to correct.
+    arr_daily_normal_temperature : np.array(float)
+        Normal temperature indexed by day of leap-year.
+    ts_temperature_n_day_average : Timeseries
+        n-day average temperature on the hourly load-grid.
     k, x : float
         Parameters in temperature-correction, temperautre-coefficient and
         temperature-sensetivity.
 
     Returns
     -----------
-    dict_data_ts : dict(timeseries)
-        Input-dictionary backloaded with temperature-corrected load and 
-        calculated daily historical normal temperature.
+    ts_load_corrected : Timeseries
+        Temperature-corrected load.
     """
     print("Performing temperature-correction of load-data...")
-    # Correction step
-    ts_load_corrected = np.zeros_like(ts_load)
-    for i in range(len(ts_load)):
-        arr_datapoint_i = ts_load[i]
-        dt_time_i = arr_datapoint_i[0]
-        fl_load_i = arr_datapoint_i[1]
-        # Removed, but should in theory be performed according to Tønne
-        # if 11 <= dt_time_i.month or dt_time_i.month <= 4:
-        if True:
-            Tn = dict_daily_normal_temperature[datetime_to_yearless_iso_string(
-                dt_time_i)]
-            Ti = dict_temperature_n_day_average[dt_time_i.date()]
-            fl_load_corrected_i = fl_load_i + fl_load_i*k*x*(Tn - Ti)
+    arr_deviation = temperature_deviation_of_timestamps(
+        ts_load[:, 0], arr_daily_normal_temperature,
+        ts_temperature_n_day_average)
+    return ts.create_standard_time_series(
+        ts_load[:, 0],
+        correct_for_temperature_deviations(ts_load[:, 1], arr_deviation, k, x),
+        ts_load.dtype)
+
+
+def reindex_load_to_hourly_grid(dict_preprocessing_config, ts_load, arr_grid):
+    """Reindexes load onto the common hourly time-grid.
+
+    Parameters
+    ----------
+    dict_preprocessing_config : dict
+        Preprocessing-config, with the optional fields "interpolation"
+        (default "linear") and "max_interpolation_gap_hours" (default 0, no
+        limit), see timeseries.reindex_timeseries.
+    ts_load : Timeseries
+        Load without NaN and None-values.
+    arr_grid : np.array(datetime64)
+        Hourly time-grid from the first to the last date of the loads.
+
+    Returns
+    ----------
+    ts_load_reindexed : Timeseries
+        Load with one datapoint per hour of arr_grid.
+
+    Notes
+    ----------
+    Aligns all loads, such that they may be summed and compared by row.
+    Hours of gaps longer than the limit are left out, as they are by the
+    load-matrix, so only loads with such gaps lose alignment.
+    """
+    print("Reindexing load onto hourly grid...")
+    str_interpolation = dict_preprocessing_config.get("interpolation", "linear")
+    int_max_gap_hours = dict_preprocessing_config.get(
+        "max_interpolation_gap_hours", 0)
+    ts_load_reindexed = ts.reindex_timeseries(
+        ts_load, arr_grid, str_interpolation, int_max_gap_hours)
+    int_missing = len(arr_grid) - np.count_nonzero(
+        np.isin(arr_grid.astype("datetime64[h]"), ts_load[:, 0]))
+    print(int_missing, "of", len(arr_grid), "hours missing, filled by",
+          str_interpolation, "interpolation")
+    if np.isnan(ts_load_reindexed[:, 1]).any():
+        ts_load_reindexed = remove_nan_and_none_datapoints(ts_load_reindexed)
+    return ts_load_reindexed
+
+
+def remove_nan_and_none_stage(dict_preprocessing_config, dict_data_ts):
+    """Preprocessing-stage removing NaN and None from the load."""
+    return {"load_measurements": remove_nan_and_none_datapoints(
+        dict_data_ts["load_measurements"])}
+
+
+def reindex_to_hourly_grid_stage(dict_preprocessing_config, dict_data_ts):
+    """Preprocessing-stage reindexing the load onto the hourly grid."""
+    return {"load_measurements": reindex_load_to_hourly_grid(
+        dict_preprocessing_config, dict_data_ts["load_measurements"],
+        dict_data_ts["hourly_grid"])}
+
+
+def correct_for_temperature_stage(dict_preprocessing_config, dict_data_ts):
+    """Preprocessing-stage correcting the load for temperature-deviations."""
+    return {"load_temperature_corrected": correct_load_for_temperature_deviations(
+        dict_data_ts["load_measurements"],
+        dict_data_ts["normal_temperature"],
+        dict_data_ts["n-day_average_temperature"],
+        dict_preprocessing_config["k_temperature_coefficient"],
+        dict_preprocessing_config["x_temperature_sensitivity"])}
+
+
+def remove_nan_and_none_matrix_stage(dict_preprocessing_config, dict_matrix):
+    """Matrix-variant of remove_nan_and_none_stage."""
+    arr_on_grid = dict_matrix["on_grid"]
+    arr_valid = arr_on_grid & ~np.isnan(dict_matrix["load_measurements"])
+    print("Removed", np.count_nonzero(arr_on_grid)
+          - np.count_nonzero(arr_valid), "of",
+          np.count_nonzero(arr_on_grid), "datapoints")
+    return {"on_grid": arr_valid}
+
+
+def reindex_to_hourly_grid_matrix_stage(dict_preprocessing_config, dict_matrix):
+    """Matrix-variant of reindex_to_hourly_grid_stage."""
+    arr_grid = dict_matrix["hourly_grid"]
+    arr_loads = dict_matrix["load_measurements"]
+    arr_on_grid = dict_matrix["on_grid"]
+    # Missing hours are NaN as well, so only rows with NaN need reindexing
+    for int_row in np.flatnonzero(np.isnan(arr_loads).any(axis=1)):
+        ts_load_reindexed = reindex_load_to_hourly_grid(
+            dict_preprocessing_config,
+            ts.create_standard_time_series(
+                arr_grid[arr_on_grid[int_row]],
+                arr_loads[int_row, arr_on_grid[int_row]]),
+            arr_grid)
+        arr_index = np.searchsorted(arr_grid, ts_load_reindexed[:, 0])
+        arr_loads[int_row] = np.nan
+        arr_loads[int_row, arr_index] = ts_load_reindexed[:, 1]
+        arr_on_grid[int_row] = False
+        arr_on_grid[int_row, arr_index] = True
+    return {"load_measurements": arr_loads, "on_grid": arr_on_grid}
+
+
+def apply_in_dtype_of_loads(fn_apply, arr_loads, list_dtypes):
+    """Applies a function to the load-matrix in the dtype of every load.
+
+    Parameters
+    ----------
+    fn_apply : function
+        Takes rows of the load-matrix and returns an array of same shape.
+    arr_loads : np.array(float)
+        Load-matrix of one row per load, see preprocess_load_matrix.
+    list_dtypes : list(np.dtype)
+        Dtype of the load of every row.
+
+    Returns
+    -------
+    np.array(float)
+        Result of fn_apply for all rows.
+
+    Notes
+    ----------
+    The load-matrix is of the widest dtype of the loads. Rows of other loads
+    are cast back to the dtype of their load, such that arithmetic rounds as
+    it would on every load by itself.
+    """
+    if len(set(list_dtypes)) <= 1:
+        return fn_apply(arr_loads)
+    arr_result = np.empty(arr_loads.shape)
+    for dtype in set(list_dtypes):
+        arr_rows = np.array([dtype_row == dtype for dtype_row in list_dtypes])
+        arr_result[arr_rows] = fn_apply(arr_loads[arr_rows].astype(dtype))
+    return arr_result
+
+
+def correct_for_temperature_matrix_stage(dict_preprocessing_config,
+                                         dict_matrix):
+    """Matrix-variant of correct_for_temperature_stage."""
+    print("Performing temperature-correction of load-matrix...")
+    arr_loads = dict_matrix["load_measurements"]
+    list_dtypes = dict_matrix["dtypes"]
+    arr_deviation = temperature_deviation_of_timestamps(
+        dict_matrix["hourly_grid"], dict_matrix["normal_temperature"],
+        dict_matrix["n-day_average_temperature"])
+    k = dict_preprocessing_config["k_temperature_coefficient"]
+    x = dict_preprocessing_config["x_temperature_sensitivity"]
+    return {"load_temperature_corrected": apply_in_dtype_of_loads(
+        lambda arr_rows: correct_for_temperature_deviations(
+            arr_rows, arr_deviation, k, x),
+        arr_loads, list_dtypes)}
+
+
+# Stages of preprocess_data, in the order they are performed
+LIST_PREPROCESSING_STAGES = []
+
+# Bump when a stage changes in a way which makes cached outputs invalid
+INT_STAGE_VERSION = 1
+
+
+def register_preprocessing_stage(
+        str_name, fn_stage, str_config_field,
+        list_input_keys, list_parameter_fields=(), fn_matrix_stage=None,
+        bool_cacheable=True):
+    """Adds a stage to the end of the preprocessing-pipeline.
+
+    Parameters
+    ----------
+    str_name : str
+        Name of the stage, as logged by preprocess_data.
+    fn_stage : function
+        Performs the stage, taking the preprocessing-config and the data of
+        the load-point, and returning a dict of new or replaced data.
+    str_config_field : str
+        Field of [preprocessing] which enables the stage.
+    list_input_keys : list(str)
+        Keys of the data the stage reads.
+    list_parameter_fields : list(str), optional
+        Fields of [preprocessing] the stage reads.
+    fn_matrix_stage : function, optional
+        Performs the stage on all loads at once, see preprocess_load_matrix.
+        The stage is performed on every load by itself if left out.
+    bool_cacheable : bool, default=True
+        Whether the output of the stage is cached, see preprocess_data.
+        Stages cheaper than hashing their inputs should not be.
+
+    Notes
+    ----------
+    The output of the stage may be cached under a hash of its inputs and
+    parameters, so fn_stage must not read any other data or fields.
+    """
+    LIST_PREPROCESSING_STAGES.append({
+        "name": str_name,
+        "function": fn_stage,
+        "config_field": str_config_field,
+        "input_keys": list(list_input_keys),
+        "parameter_fields": list(list_parameter_fields),
+        "matrix_function": fn_matrix_stage,
+        "cacheable": bool_cacheable,
+    })
+    return
+
+
+register_preprocessing_stage(
+    "remove_nan_and_none", remove_nan_and_none_stage,
+    "remove_NaN_and_None", ["load_measurements"],
+    fn_matrix_stage=remove_nan_and_none_matrix_stage, bool_cacheable=False)
+register_preprocessing_stage(
+    "reindex_to_hourly_grid", reindex_to_hourly_grid_stage,
+    "reindex_to_hourly_grid", ["load_measurements", "hourly_grid"],
+    ["interpolation", "max_interpolation_gap_hours"],
+    reindex_to_hourly_grid_matrix_stage, bool_cacheable=False)
+register_preprocessing_stage(
+    "correct_for_temperature", correct_for_temperature_stage,
+    "correct_for_temperature",
+    ["load_measurements", "normal_temperature", "n-day_average_temperature"],
+    ["k_temperature_coefficient", "x_temperature_sensitivity"],
+    correct_for_temperature_matrix_stage, bool_cacheable=False)
+# Additional stages are registered the same way, i.e.
+# register_preprocessing_stage(
+#     "example", example_preprocessing_stage, "example", ["other_field"])
+
+
+def enabled_preprocessing_stages(dict_preprocessing_config):
+    """Returns the stages enabled by the config, in the order performed."""
+    return [dict_stage for dict_stage in LIST_PREPROCESSING_STAGES
+            if dict_preprocessing_config.get(dict_stage["config_field"], "")]
+
+
+def fingerprint_data(data):
+    """Returns hash of the contents of a timeseries or array."""
+    if isinstance(data, ts.Timeseries):
+        return parse_cache.fingerprint_arrays(data[:, 0], data[:, 1])
+    return parse_cache.fingerprint_arrays(np.asarray(data))
+
+
+def hash_strings(*strings):
+    """Returns hex-digest of strings, see parse_cache.fingerprint_file."""
+    return hashlib.sha1(json.dumps(strings, default=str).encode()).hexdigest()
+
+
+def arrays_of_stage_output(dict_output):
+    """Converts output of a stage to arrays which can be cached."""
+    dict_arrays = {}
+    for str_key, data in dict_output.items():
+        if isinstance(data, ts.Timeseries):
+            dict_arrays[str_key + "__time"] = data[:, 0]
+            dict_arrays[str_key + "__data"] = data[:, 1]
         else:
-            fl_load_corrected_i = fl_load_i
+            dict_arrays[str_key] = np.asarray(data)
+    return dict_arrays
+
+
+def stage_output_of_arrays(dict_arrays):
+    """Converts cached arrays back to output of a stage."""
+    dict_output = {}
+    for str_key, arr in dict_arrays.items():
+        if str_key.endswith("__time"):
+            str_key = str_key[:-len("__time")]
+            dict_output[str_key] = ts.create_standard_time_series(
+                arr, dict_arrays[str_key + "__data"])
+        elif not str_key.endswith("__data"):
+            dict_output[str_key] = arr
+    return dict_output
+
+
+# Entries of every stage-cache in use, as paths ordered oldest first
+DICT_STAGE_CACHE_ENTRIES = {}
+
 
-        ts_load_corrected[i][0] = dt_time_i
-        ts_load_corrected[i][1] = fl_load_corrected_i
+def store_stage_cache_entry(str_cache_path, int_max_entries, str_entry_path,
+                            str_fingerprint, **arrays):
+    """Stores output of a stage, evicting the oldest entries of the cache.
 
-    return ts_load_corrected
+    Parameters
+    ----------
+    str_cache_path : str
+        Directory of the stage-cache.
+    int_max_entries : int
+        Number of entries the cache is bounded to.
+    str_entry_path : str
+        Path of the entry to store.
+    str_fingerprint : str
+        Fingerprint of the entry, see parse_cache.store_cache_entry.
+    **arrays : np.array
+        Arrays to store.
+
+    Notes
+    ----------
+    The entries already in the directory are listed by age once per run,
+    and kept track of from there on.
+    """
+    parse_cache.store_cache_entry(str_entry_path, str_fingerprint, **arrays)
+    if str_cache_path not in DICT_STAGE_CACHE_ENTRIES:
+        list_entries = sorted(
+            (entry for entry in os.scandir(str_cache_path)
+             if entry.name.startswith("stage_")
+             and entry.name.endswith(".npz")),
+            key=lambda entry: entry.stat().st_mtime)
+        DICT_STAGE_CACHE_ENTRIES[str_cache_path] = dict.fromkeys(
+            entry.path for entry in list_entries)
+    dict_entries = DICT_STAGE_CACHE_ENTRIES[str_cache_path]
+    dict_entries.pop(str_entry_path, None)
+    dict_entries[str_entry_path] = None
+
+    while len(dict_entries) > int_max_entries:
+        str_oldest_path = next(iter(dict_entries))
+        del dict_entries[str_oldest_path]
+        try:
+            os.remove(str_oldest_path)
+        except FileNotFoundError:
+            pass
+    return
+
+
+# Bound of the stage-cache if "cache_max_entries" is left out
+INT_DEFAULT_STAGE_CACHE_ENTRIES = 1000
+
+
+def select_preprocessed_load(dict_data_ts):
+    """Sets "load" to the last preprocessed version of the load."""
+    if "correct_for_temperature" in dict_data_ts["preprocessing_timings"]:
+        dict_data_ts["load"] = dict_data_ts["load_temperature_corrected"]
+    else:
+        dict_data_ts["load"] = dict_data_ts["load_measurements"]
+    return dict_data_ts
 
 
-def preprocess_data(dict_preprocessing_config, dict_data_ts):
+def preprocess_data(dict_preprocessing_config, dict_data_ts, list_stages=None):
     """Performs preprocessing on given data based on configuration.
 
     Parameters
@@ -182,6 +660,9 @@ def preprocess_data(dict_preprocessing_config, dict_data_ts):
         Dictionary of which preprocessing steps to perform.
     dict_data_ts : dict(timeseries)
         Timeseries to preprocess or to use for preprocessing purposes.
+    list_stages : list(dict), optional
+        Stages to perform, defaulting to every enabled stage, see
+        enabled_preprocessing_stages.
 
     Returns
     ----------
@@ -191,39 +672,235 @@ def preprocess_data(dict_preprocessing_config, dict_data_ts):
     Notes
     ----------
     Main functionality of this module.
+
+    Performs the stages of LIST_PREPROCESSING_STAGES in order, and reports
+    how long each stage took under "preprocessing_timings".
+
+    If the optional field "cache_path" is set, the output of every cacheable
+    stage, see register_preprocessing_stage, is cached in that directory,
+    bounded to the newest "cache_max_entries" (default
+    INT_DEFAULT_STAGE_CACHE_ENTRIES) entries. The cache-entry of a stage is
+    named by a hash of its inputs and parameters, such that outputs of
+    different parameters are kept side by side. Inputs produced by earlier
+    cached stages are hashed by the stage and parameters which produced them
+    rather than by their contents. The built-in stages cost about as much as
+    hashing their inputs, and are never cached.
     """
     print("Preprocessing data...")
-
-    list_preprocessing_log = []
-
-    if dict_preprocessing_config["remove_NaN_and_None"]:
-        dict_data_ts["load_measurements"] = remove_nan_and_none_datapoints(dict_data_ts["load_measurements"])
-        list_preprocessing_log.append("remove_nan_and_none")
-
-    if dict_preprocessing_config["correct_for_temperature"]:
-        ts_load = dict_data_ts["load_measurements"]
-        dict_daily_normal_temperature = dict_data_ts["normal_temperature"]
-        dict_temperature_3_day_average = dict_data_ts["n-day_average_temperature"]
-        k = dict_preprocessing_config["k_temperature_coefficient"]
-        x = dict_preprocessing_config["x_temperature_sensitivity"]
-
-        dict_data_ts["load_temperature_corrected"] = correct_load_for_temperature_deviations(
-            ts_load, 
-            dict_daily_normal_temperature,
-            dict_temperature_3_day_average,
-            k, x)
-        list_preprocessing_log.append("correct_for_temperature")
-
-    # Format allows for simple pipelining of additional preprocessing steps.
-    # if dict_preprocessing_config["example"]:
-    #   dict_data_ts["field"] = example_preprocessing_step(dict_preprocessing_config, dict_data_ts["other_field"])
-    # if dict_preprocessing_config["another"]:
-    #   dict_data_ts["other_field"] = another_preprocessing_step(dict_preprocessing_config, dict_data_ts["yet_another_field"])
-
-    if "correct_for_temperature" in list_preprocessing_log:
-        dict_data_ts["load"] = dict_data_ts["load_temperature_corrected"]
-    else:
-        dict_data_ts["load"] = dict_data_ts["load_measurements"]
+    if list_stages is None:
+        list_stages = enabled_preprocessing_stages(dict_preprocessing_config)
+    str_cache_path = dict_preprocessing_config.get("cache_path", "")
+    int_max_entries = dict_preprocessing_config.get(
+        "cache_max_entries", INT_DEFAULT_STAGE_CACHE_ENTRIES)
+    if str_cache_path:
+        os.makedirs(str_cache_path, exist_ok=True)
+
+    dict_timings = dict(dict_data_ts.get("preprocessing_timings", {}))
+    dict_fingerprints = {}
+    for dict_stage in list_stages:
+        str_name = dict_stage["name"]
+        fl_start = time.perf_counter()
+
+        dict_output = None
+        bool_cache = bool(str_cache_path) and dict_stage["cacheable"]
+        if bool_cache:
+            for str_key in dict_stage["input_keys"]:
+                if str_key not in dict_fingerprints:
+                    dict_fingerprints[str_key] = fingerprint_data(
+                        dict_data_ts[str_key])
+            str_stage_hash = hash_strings(
+                INT_STAGE_VERSION, str_name,
+                [dict_fingerprints[str_key]
+                 for str_key in dict_stage["input_keys"]],
+                [dict_preprocessing_config.get(str_field)
+                 for str_field in dict_stage["parameter_fields"]])
+            str_entry_path = os.path.join(
+                str_cache_path, "stage_" + str_stage_hash + ".npz")
+            dict_cached = parse_cache.load_cache_entry(
+                str_entry_path, str_stage_hash)
+            if dict_cached is not None:
+                dict_output = stage_output_of_arrays(dict_cached)
+        bool_cached = dict_output is not None
+        if not bool_cached:
+            dict_output = dict_stage["function"](
+                dict_preprocessing_config, dict_data_ts)
+            if bool_cache:
+                store_stage_cache_entry(
+                    str_cache_path, int_max_entries, str_entry_path,
+                    str_stage_hash, **arrays_of_stage_output(dict_output))
+
+        for str_key in dict_output:
+            dict_data_ts[str_key] = dict_output[str_key]
+            if bool_cache:
+                dict_fingerprints[str_key] = hash_strings(
+                    str_stage_hash, str_key)
+            else:
+                dict_fingerprints.pop(str_key, None)
+        dict_timings[str_name] = time.perf_counter() - fl_start
+        print("Stage", str_name, "took",
+              "{:.4f}".format(dict_timings[str_name]),
+              "s (cached)" if bool_cached else "s")
+
+    dict_data_ts["preprocessing_timings"] = dict_timings
+    select_preprocessed_load(dict_data_ts)
 
     print("Successfully completed all preprocessing steps")
     return dict_data_ts
+
+
+def place_load_on_grid(ts_load, arr_grid):
+    """Finds the positions of the datapoints of a load on the hourly grid.
+
+    Parameters
+    ----------
+    ts_load : Timeseries
+        Load without NaT-timestamps.
+    arr_grid : np.array(datetime64[h])
+        Hourly time-grid of the loads.
+
+    Returns
+    ----------
+    arr_index : np.array(int)
+        Position on the grid of every datapoint of ts_load.
+    None
+        If the load is not sorted, has duplicate timestamps or timestamps
+        off the grid.
+    """
+    arr_time = ts_load[:, 0]
+    if len(arr_time) and (arr_time[0] < arr_grid[0]
+                          or arr_time[-1] > arr_grid[-1]
+                          or (np.diff(arr_time) <= np.timedelta64(0)).any()):
+        return None
+    arr_index = np.searchsorted(arr_grid, arr_time)
+    if (arr_grid[arr_index] != arr_time).any():
+        return None
+    return arr_index
+
+
+# Keys of the matrix-data of preprocess_load_matrix describing its layout,
+# which are not split into the data of every load-point
+TUPLE_MATRIX_LAYOUT_KEYS = ("on_grid", "dtypes")
+
+
+def preprocess_load_matrix(dict_preprocessing_config, dict_loads_ts,
+                           dict_common_ts):
+    """Performs preprocessing of all loads as one load-point by time matrix.
+
+    Parameters
+    ----------
+    dict_preprocessing_config : dict
+        Dictionary of which preprocessing steps to perform.
+    dict_loads_ts : dict(timeseries)
+        Measured load of every load-point, keyed by ID.
+    dict_common_ts : dict
+        Data shared by all load-points, see load_points.prepare_common_data.
+
+    Yields
+    ----------
+    str_ID : str
+        ID of load-point, in the order of dict_loads_ts.
+    dict_node_ts : dict(timeseries)
+        Preprocessed data of str_ID, as returned by preprocess_data.
+
+    Notes
+    ----------
+    Gives the same loads as preprocess_data on every load-point. The loads
+    are placed on the hourly grid of dict_common_ts, as the load-point by
+    time matrix "load_measurements", where "on_grid" masks the datapoints of
+    every load and "dtypes" holds the dtype of every load.
+
+    The enabled stages of LIST_PREPROCESSING_STAGES are performed in order
+    on the whole matrix, as long as they have a matrix-variant, and
+    "preprocessing_timings" holds the time of each over all loads. Matrices
+    the stages return are split into the timeseries of a load-point only
+    when it is yielded, such that besides the matrix only the data of one
+    load-point is held at a time. From the first stage without a
+    matrix-variant, the remaining stages are performed on each yielded
+    load-point by preprocess_data, which also caches them.
+
+    Loads whose timestamps are not on the grid are preprocessed separately
+    by preprocess_data when they are yielded.
+    """
+    print("Preprocessing all loads as one matrix...")
+    arr_grid = dict_common_ts["hourly_grid"].astype("datetime64[h]")
+    list_stages = enabled_preprocessing_stages(dict_preprocessing_config)
+    int_matrix_stages = 0
+    while int_matrix_stages < len(list_stages) \
+            and list_stages[int_matrix_stages]["matrix_function"] is not None:
+        int_matrix_stages += 1
+    bool_remove_nan = "remove_nan_and_none" in [
+        dict_stage["name"] for dict_stage in list_stages[:int_matrix_stages]]
+
+    dict_rows = {}
+    list_placed = []
+    for str_ID in dict_loads_ts:
+        ts_load = dict_loads_ts[str_ID]
+        arr_keep = ~np.isnat(ts_load[:, 0])
+        arr_index = None
+        if int_matrix_stages and (bool_remove_nan or arr_keep.all()):
+            arr_index = place_load_on_grid(ts_load[arr_keep], arr_grid)
+        if arr_index is None:
+            continue
+        dict_rows[str_ID] = len(list_placed)
+        list_placed.append((arr_index, ts_load[:, 1][arr_keep]))
+
+    # Of the widest dtype of the loads, see apply_in_dtype_of_loads
+    list_dtypes = [arr_values.dtype for _arr_index, arr_values in list_placed]
+    arr_loads = np.full((len(dict_rows), len(arr_grid)), np.nan,
+                        dtype=np.result_type(np.float32, *list_dtypes))
+    arr_on_grid = np.zeros(arr_loads.shape, dtype=bool)
+    for int_row, (arr_index, arr_values) in enumerate(list_placed):
+        arr_loads[int_row, arr_index] = arr_values
+        arr_on_grid[int_row, arr_index] = True
+    del list_placed
+
+    dict_matrix = dict(dict_common_ts)
+    dict_matrix["hourly_grid"] = arr_grid
+    dict_matrix["load_measurements"] = arr_loads
+    dict_matrix["on_grid"] = arr_on_grid
+    dict_matrix["dtypes"] = list_dtypes
+    dict_timings = {}
+    for dict_stage in list_stages[:int_matrix_stages]:
+        str_name = dict_stage["name"]
+        fl_start = time.perf_counter()
+        dict_matrix.update(dict_stage["matrix_function"](
+            dict_preprocessing_config, dict_matrix))
+        dict_timings[str_name] = time.perf_counter() - fl_start
+        print("Stage", str_name, "took",
+              "{:.4f}".format(dict_timings[str_name]), "s for all loads")
+
+    list_load_keys = [str_key for str_key in dict_matrix
+                      if str_key not in dict_common_ts
+                      and str_key not in TUPLE_MATRIX_LAYOUT_KEYS]
+    for str_ID in dict_loads_ts:
+        if str_ID not in dict_rows:
+            if int_matrix_stages:
+                print("Load-point", str_ID,
+                      "is off the grid, preprocessing separately...")
+            dict_node_ts = dict(dict_common_ts)
+            dict_node_ts["load_measurements"] = dict_loads_ts[str_ID]
+            yield str_ID, preprocess_data(
+                dict_preprocessing_config, dict_node_ts, list_stages)
+            continue
+        int_row = dict_rows[str_ID]
+        dtype = list_dtypes[int_row]
+        arr_row_on_grid = dict_matrix["on_grid"][int_row]
+        dict_node_ts = dict(dict_common_ts)
+        for str_key in list_load_keys:
+            data = dict_matrix[str_key]
+            if isinstance(data, np.ndarray):
+                dict_node_ts[str_key] = ts.create_standard_time_series(
+                    arr_grid[arr_row_on_grid], data[int_row, arr_row_on_grid],
+                    dtype)
+            else:
+                dict_node_ts[str_key] = data[int_row]
+        dict_node_ts["preprocessing_timings"] = dict(dict_timings)
+        if int_matrix_stages < len(list_stages):
+            dict_node_ts = preprocess_data(
+                dict_preprocessing_config, dict_node_ts,
+                list_stages[int_matrix_stages:])
+        else:
+            select_preprocessed_load(dict_node_ts)
+        yield str_ID, dict_node_ts
+
+    print("Successfully completed all preprocessing steps")
@@ -6,6 +6,7 @@ Notes
 Requires load-measurements to be temperature-corrected.
 """
 import numpy as np
+import objects.timeseries as ts
 
 
 def calculate_variation_values(
@@ -30,81 +31,148 @@ def calculate_variation_values(
         Either max or average of all datapoints, depending on choice.
     dict_variation_values : dict
         Dictionary of variation values keyed based on alternative chosen.
-    """
-    # Initialization of empty data containers
-    if str.lower(str_variation_value_alternative) == "a":
-        dict_variation_values = {
-            "monthly": [[] for _ in range(12)],
-            "workday_hourly": [[] for _ in range(24)],
-            "weekend_hourly": [[] for _ in range(24)]
-        }
-    elif str.lower(str_variation_value_alternative) == "b":
-        dict_variation_values = {
-            "workday_monthly": [[[] for _ in range(24)] for _ in range(12)],
-            "weekend_monthly": [[[] for _ in range(24)] for _ in range(12)]
-        }
-    else:
-        raise Exception("Unsupported variation value alternative")
+        Hourly values are arrays indexed by hour, or by month and hour.
 
-    # Step 2a, categorize
-    # For every datapoint, append it to the category(/ies) it will be used as
-    # basis for calculation.
-    for i in range(len(ts_measured_load)):
-        dt_time_i = ts_measured_load[i, 0]
-        fl_load_i = ts_measured_load[i, 1]
-        int_month_i = dt_time_i.month
-        int_hour_i = dt_time_i.hour
-        bool_date_is_workday = (dt_time_i.weekday() < 5)
-
-        if str.lower(str_variation_value_alternative) == "a":
-            dict_variation_values["monthly"][int_month_i - 1].append(fl_load_i)
-            if bool_date_is_workday:
-                dict_variation_values["workday_hourly"][int_hour_i].append(
-                    fl_load_i)
-            else:
-                dict_variation_values["weekend_hourly"][int_hour_i].append(
-                    fl_load_i)
-
-        elif str.lower(str_variation_value_alternative) == "b":
-            if bool_date_is_workday:
-                dict_variation_values["workday_monthly"][int_month_i -
-                                                         1][int_hour_i].append(fl_load_i)
-            else:
-                dict_variation_values["weekend_monthly"][int_month_i -
-                                                         1][int_hour_i].append(fl_load_i)
-
-        else:
-            raise Exception("Unsupported variation value alternative")
-
-    # Step 2b, calculate variation
-    # Each category (list of datapoints) is replaced by the chosen function
-    # value (average or max) of that list, normalized.
+    Notes
+    ----------
+    The category of every datapoint is found from integer arrays of month,
+    hour and day-type, and all categories are reduced in one grouped pass.
+    """
     if str.lower(str_max_or_average_variation) == "max":
         fn_variation_baseline = np.average
+        str_variation_reduction = "mean"
     elif str.lower(str_max_or_average_variation) == "average":
         fn_variation_baseline = np.max
+        str_variation_reduction = "max"
     else:
         raise Exception("Unsupported method for calculating variation")
 
-    fl_normalization_baseline = fn_variation_baseline(ts_measured_load[:, 1])
-
+    # Step 2a, categorize
+    # Every datapoint is given the index of the category it will be used as
+    # basis for calculation, weekends following all workday-categories.
+    arr_time = ts_measured_load[:, 0]
+    arr_load = ts_measured_load[:, 1]
+    arr_hour = hour_index_of_timestamps(arr_time)
+    arr_month = month_index_of_timestamps(arr_time)
+    arr_weekend = (~workday_mask_of_timestamps(arr_time)).astype(np.int64)
     if str.lower(str_variation_value_alternative) == "a":
-        for category in dict_variation_values:
-            dict_variation_values[category] = list(
-                map(lambda arr: fn_variation_baseline(arr) / fl_normalization_baseline, 
-                    dict_variation_values[category]))
+        # Monthly values are reduced by month alone in step 2b
+        tuple_shape = (2, 24)
+        arr_category = arr_weekend*24 + arr_hour
     elif str.lower(str_variation_value_alternative) == "b":
-        for category in dict_variation_values:
-            for month in range(12):
-                dict_variation_values[category][month] = list(
-                    map(lambda arr: fn_variation_baseline(arr) / fl_normalization_baseline,
-                        dict_variation_values[category][month]))
+        tuple_shape = (2, 12, 24)
+        arr_category = arr_weekend*12*24 + arr_month*24 + arr_hour
     else:
         raise Exception("Unsupported variation value alternative")
 
+    # Step 2b, calculate variation
+    # Each category is reduced by the chosen function value (average or max)
+    # of its datapoints, normalized. Categories without datapoints are NaN.
+    fl_normalization_baseline = fn_variation_baseline(arr_load)
+    arr_variation_values = reduce_by_category(
+        arr_category, arr_load, np.prod(tuple_shape), str_variation_reduction
+    ).reshape(tuple_shape) / fl_normalization_baseline
+
+    if str.lower(str_variation_value_alternative) == "a":
+        dict_variation_values = {
+            "monthly": list(
+                calculate_monthly_values(
+                    arr_month, arr_load, str_variation_reduction)
+                / fl_normalization_baseline),
+            "workday_hourly": arr_variation_values[0],
+            "weekend_hourly": arr_variation_values[1]
+        }
+    else:
+        dict_variation_values = {
+            "workday_monthly": arr_variation_values[0],
+            "weekend_monthly": arr_variation_values[1]
+        }
+
     return fl_normalization_baseline, dict_variation_values
 
 
+def reduce_by_category(arr_category, arr_values, int_categories, str_reduction):
+    """Reduces values of every category.
+
+    Parameters
+    ----------
+    arr_category : np.array(int)
+        Category of every value, from 0 up to int_categories.
+    arr_values : np.array(float)
+        Values to reduce.
+    int_categories : int
+        Amount of categories.
+    str_reduction : str
+        Either "mean" or "max".
+
+    Returns
+    ----------
+    arr_reduced : np.array(float)
+        Reduced value of every category, of the dtype of arr_values. NaN for
+        categories without values.
+    """
+    if str_reduction == "mean":
+        with np.errstate(invalid="ignore"):
+            arr_reduced = np.bincount(
+                arr_category, arr_values, minlength=int_categories) \
+                / np.bincount(arr_category, minlength=int_categories)
+    elif str_reduction == "max":
+        arr_reduced = np.full(int_categories, -np.inf, dtype=arr_values.dtype)
+        np.maximum.at(arr_reduced, arr_category, arr_values)
+        arr_reduced[arr_reduced == -np.inf] = np.nan
+    else:
+        raise Exception("Unsupported method for calculating variation")
+    return arr_reduced.astype(arr_values.dtype, copy=False)
+
+
+def calculate_monthly_values(arr_month, arr_load, str_reduction):
+    """Reduces load of every calendar month, pooled over all years.
+
+    Parameters
+    ----------
+    arr_month : np.array(int)
+        Month of every datapoint, see month_index_of_timestamps.
+    arr_load : np.array(float)
+        Temperature-corrected load of every datapoint.
+    str_reduction : str
+        Either "mean" or "max".
+
+    Returns
+    ----------
+    arr_monthly : np.array(float)
+        Reduced load of january through december, NaN for months without
+        datapoints.
+
+    Notes
+    ----------
+    One grouped pass over the hourly datapoints, see reduce_by_category.
+    """
+    return reduce_by_category(
+        arr_month, np.asarray(arr_load, dtype=np.float64), 12, str_reduction)
+
+
+def month_index_of_timestamps(arr_time):
+    """Returns month of every timestamp as index, 0 being january.
+    """
+    return np.asarray(arr_time).astype("datetime64[M]").astype(np.int64) % 12
+
+
+def hour_index_of_timestamps(arr_time):
+    """Returns hour of day of every timestamp, 0 being midnight.
+    """
+    arr_time = np.asarray(arr_time)
+    return (arr_time.astype("datetime64[h]")
+            - arr_time.astype("datetime64[D]")).astype(np.int64)
+
+
+def workday_mask_of_timestamps(arr_time):
+    """Returns whether every timestamp falls on monday through friday.
+    """
+    # 1970-01-01 was a thursday, the fourth day of the week
+    arr_days = np.asarray(arr_time).astype("datetime64[D]").astype(np.int64)
+    return (arr_days + 3) % 7 < 5
+
+
 def generate_deterministic_model(
         ts_measured_load,
         dict_variation_values,
@@ -128,33 +196,34 @@ def generate_deterministic_model(
     ----------
     ts_load_deterministic_model : timeseries
         Timeseries of deterministic load-model.
+
+    Notes
+    ----------
+    The variation values of every datapoint are gathered from the tables by
+    arrays of month, hour and day-type, such that the model is found in one
+    pass over the load.
     """
-    ts_load_deterministic_model = np.zeros_like(ts_measured_load)
-    for i in range(len(ts_measured_load)):
-        dt_time_i = ts_measured_load[i, 0]
-        int_month_i = dt_time_i.month
-        int_hour_i = dt_time_i.hour
-        bool_date_is_workday = (dt_time_i.weekday() < 5)
-
-        fl_modelled_load_i = fl_normalization_baseline
-        if str.lower(str_variation_value_alternative) == "a":
-            fl_modelled_load_i *= dict_variation_values["monthly"][int_month_i - 1]
-            if bool_date_is_workday:
-                fl_modelled_load_i *= dict_variation_values["workday_hourly"][int_hour_i]
-            else:
-                fl_modelled_load_i *= dict_variation_values["weekend_hourly"][int_hour_i]
-
-        elif str.lower(str_variation_value_alternative) == "b":
-            if bool_date_is_workday:
-                fl_modelled_load_i *= dict_variation_values["workday_monthly"][int_month_i - 1][int_hour_i]
-            else:
-                fl_modelled_load_i *= dict_variation_values["weekend_monthly"][int_month_i - 1][int_hour_i]
-        else:
-            raise Exception("Unsupported variation value alternative")
+    arr_time = ts_measured_load[:, 0]
+    arr_month = month_index_of_timestamps(arr_time)
+    arr_hour = hour_index_of_timestamps(arr_time)
+    arr_weekend = (~workday_mask_of_timestamps(arr_time)).astype(np.int64)
+
+    if str.lower(str_variation_value_alternative) == "a":
+        arr_hourly = np.stack([dict_variation_values["workday_hourly"],
+                               dict_variation_values["weekend_hourly"]])
+        arr_modelled_load = fl_normalization_baseline \
+            * np.asarray(dict_variation_values["monthly"])[arr_month] \
+            * arr_hourly[arr_weekend, arr_hour]
+    elif str.lower(str_variation_value_alternative) == "b":
+        arr_monthly_hourly = np.stack([dict_variation_values["workday_monthly"],
+                                       dict_variation_values["weekend_monthly"]])
+        arr_modelled_load = fl_normalization_baseline \
+            * arr_monthly_hourly[arr_weekend, arr_month, arr_hour]
+    else:
+        raise Exception("Unsupported variation value alternative")
 
-        ts_load_deterministic_model[i, :] = [dt_time_i, fl_modelled_load_i]
-        ts_load_deterministic_model = np.array(ts_load_deterministic_model)
-    return ts_load_deterministic_model
+    return ts.create_standard_time_series(
+        arr_time, arr_modelled_load, ts_measured_load.dtype)
 
 
 def generate_stochastic_model(
@@ -189,7 +258,7 @@ def generate_stochastic_model(
         # See https://stackoverflow.com/a/37616966 for potential implementation
         raise Exception("Not yet implemented")
 
-    ts_stochastic_model = np.zeros_like(ts_deterministic_model)
+    ts_stochastic_model = ts_deterministic_model.copy()
     for i in range(len(ts_deterministic_model)):
         dt_time_i = ts_deterministic_model[i, 0]
         fl_load_baseline_i = ts_deterministic_model[i, 1]
@@ -204,7 +273,6 @@ def generate_stochastic_model(
             raise Exception("Unsupported stochastic source")
         ts_stochastic_model[i, :] = [dt_time_i,
                                      fl_load_baseline_i*(1 + fl_random_value)]
-    ts_stochastic_model = np.array(ts_stochastic_model)
     return ts_stochastic_model
 
 
@@ -241,7 +309,7 @@ def create_toenne_load_model(dict_data_ts, dict_parameters):
         fl_normalization_baseline,  str_variation_value_alternative)
 
     # Step 4 of Tønne
-    ts_relative_model_error = np.zeros_like(ts_measured_load)
+    ts_relative_model_error = ts_measured_load.copy()
     for i in range(len(ts_measured_load)):
         dt_time_i = ts_measured_load[i, 0]
         fl_actual_load_i = ts_measured_load[i, 1]
@@ -249,7 +317,6 @@ def create_toenne_load_model(dict_data_ts, dict_parameters):
         fl_relative_error_i = (
             fl_actual_load_i - fl_modelled_load_i) / fl_modelled_load_i
         ts_relative_model_error[i, :] = [dt_time_i, fl_relative_error_i]
-    ts_relative_model_error = np.array(ts_relative_model_error)
 
     # Step 5 of Tønne
     # Todo: different periods for the histograms
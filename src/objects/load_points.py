@@ -11,20 +11,364 @@ change code outside this module.
 The unit of the load is implicitly kW (KiloWatt), but changing this will not affect calculations.
 
 """
+import os
 import datetime as dt
+import weakref
+import itertools
+import collections.abc
+import numpy as np
 import init.preprocessing as preprocessing
+import init.parse_cache as parse_cache
 import modelling.modelling as modelling
+import objects.timeseries as ts
 import utilities
 import plotting
 
+# Rows of a load-matrix summed at a time, bounding the memory of a sum
+INT_ROWS_PER_BLOCK = 256
+
+
+class LoadMatrix(collections.abc.MutableMapping):
+    """Columnar store of load-points sharing a common time-axis.
+
+    Attributes
+    ----------
+    arr_time : np.array(datetime64[s])
+        Time-axis shared by all rows.
+    arr_loads : np.array(float)
+        Loads, one row per load-point and one column per timestamp of
+        arr_time. NaN marks timestamps missing from a load-point.
+    dict_index : dict
+        Row of arr_loads keyed by load-point ID.
+    list_row_IDs : list(str)
+        ID of every row of arr_loads, the inverse of dict_index.
+    dict_detached : dict(timeseries)
+        Load-points whose timestamps are not on arr_time, and clones sharing
+        the arrays of another timeseries, stored as is.
+    dict_shared_arrays : weakref.WeakValueDictionary
+        Arrays of the detached clones keyed by digest, such that identical
+        clones are stored once.
+    dict_resampled : dict(dict(Timeseries))
+        Resampled levels of rows, keyed by ID, see
+        timeseries.resample_timeseries.
+    str_backing_path : str
+        Path of the .npy-file arr_loads is memory-mapped to, empty if the
+        loads are held in memory.
+
+    Notes
+    ----------
+    Behaves like a dictionary of timeseries keyed by ID, such that code
+    written for dict_loads_ts keeps working. Each access creates a timeseries
+    from the row of the load-point, leaving out missing timestamps, so
+    modifications of an accessed timeseries must be assigned back to be kept.
+    Timeseries of the same row share the cache of its resampled levels,
+    which is dropped when the load-point is assigned to or deleted.
+
+    When backed by a file, rows are read from disk as they are accessed or
+    summed, see sum_of_load_points, and processes memory-mapping the same
+    file share it through the page-cache of the operating system. Detached
+    load-points are never written to the backing file.
+
+    Clones, see timeseries.clone_timeseries, are kept detached rather than
+    copied into a row, so copied customers cost no memory beyond their
+    transform until they are written to.
+    """
+
+    def __init__(self, arr_time, dtype=np.float64, str_backing_path=""):
+        self.arr_time = np.asarray(arr_time, dtype="datetime64[s]")
+        self.dict_index = {}
+        self.list_row_IDs = []
+        self.dict_detached = {}
+        self.dict_shared_arrays = weakref.WeakValueDictionary()
+        self.dict_resampled = {}
+        self.str_backing_path = str_backing_path
+        self._int_rows = 0
+        self._arr_buffer = np.empty((0, len(self.arr_time)), dtype=dtype)
+
+    @property
+    def arr_loads(self):
+        return self._arr_buffer[:self._int_rows]
+
+    def _reserve_rows(self, int_rows):
+        """Makes room for at least int_rows rows, doubling the capacity.
+
+        Notes
+        ----------
+        A backing file is grown by writing a larger file next to it, which
+        then replaces it.
+        """
+        if int_rows <= len(self._arr_buffer):
+            return
+        int_capacity = max(int_rows, 2 * len(self._arr_buffer))
+        tup_shape = (int_capacity, len(self.arr_time))
+        dtype = self._arr_buffer.dtype
+        if not self.str_backing_path:
+            arr_buffer = np.empty(tup_shape, dtype=dtype)
+            arr_buffer[:self._int_rows] = self.arr_loads
+            self._arr_buffer = arr_buffer
+            return
+
+        str_directory = os.path.dirname(self.str_backing_path)
+        if str_directory:
+            os.makedirs(str_directory, exist_ok=True)
+        str_tmp_path = self.str_backing_path + ".tmp"
+        arr_buffer = np.lib.format.open_memmap(
+            str_tmp_path, mode="w+", dtype=dtype, shape=tup_shape)
+        arr_buffer[:self._int_rows] = self.arr_loads
+        arr_buffer.flush()
+        # Mappings must be released before the file can be replaced
+        del arr_buffer
+        self._arr_buffer = None
+        os.replace(str_tmp_path, self.str_backing_path)
+        self._arr_buffer = np.load(self.str_backing_path, mmap_mode="r+")
+        return
+
+    def flush(self):
+        """Writes loads and index to the backing file, if any.
+
+        Notes
+        ----------
+        The index, see index_path_of_backing_file, holds the time-axis and
+        the ID of every row, such that other processes can memory-map the
+        loads.
+        """
+        if not self.str_backing_path:
+            return
+        if isinstance(self._arr_buffer, np.memmap):
+            self._arr_buffer.flush()
+        str_index_path = index_path_of_backing_file(self.str_backing_path)
+        with open(str_index_path, 'wb') as fp:
+            np.savez(fp, time=self.arr_time,
+                     IDs=np.array(self.list_row_IDs, dtype=str))
+        return
+
+    def get_or_add_row(self, str_ID):
+        """Returns row of a load-point in arr_loads.
+
+        Notes
+        ----------
+        Load-points missing from the matrix are given a new row of only
+        missing values, replacing any detached load-point of the same ID.
+        """
+        if str_ID not in self.dict_index:
+            self.dict_detached.pop(str_ID, None)
+            self._reserve_rows(self._int_rows + 1)
+            self.dict_index[str_ID] = self._int_rows
+            self.list_row_IDs.append(str_ID)
+            self._int_rows += 1
+            self.arr_loads[self.dict_index[str_ID]] = np.nan
+        return self.dict_index[str_ID]
+
+    def sum_of_load_points(self, list_IDs, str_gap_policy="zero"):
+        """Returns the sum of the loads of several load-points.
+
+        Parameters
+        ----------
+        list_IDs : list(str)
+            IDs of the load-points to sum.
+        str_gap_policy : str, default="zero"
+            How to treat timestamps missing from some of the loads, see
+            timeseries.add_many.
+
+        Returns
+        ----------
+        ts_sum : Timeseries
+            Sum of the loads on the timestamps present in any of them.
+
+        Notes
+        ----------
+        Rows are summed directly over the shared time-axis, INT_ROWS_PER_BLOCK
+        rows at a time, without creating a timeseries per row. Detached
+        load-points are then added to the sum of the rows one at a time.
+        """
+        list_rows = [self.dict_index[str_ID] for str_ID in list_IDs
+                     if str_ID in self.dict_index]
+        arr_sum = np.zeros(len(self.arr_time))
+        arr_count = np.zeros(len(self.arr_time), dtype=int)
+        # Empty loads are ignored, as by timeseries.add_many
+        int_summed = 0
+        for int_start in range(0, len(list_rows), INT_ROWS_PER_BLOCK):
+            arr_block = self.arr_loads[
+                list_rows[int_start:int_start + INT_ROWS_PER_BLOCK]]
+            arr_missing = np.isnan(arr_block)
+            arr_sum += np.nansum(arr_block, axis=0, dtype=np.float64)
+            arr_count += np.count_nonzero(~arr_missing, axis=0)
+            int_summed += np.count_nonzero(~arr_missing.all(axis=1))
+
+        list_rows_ts = []
+        if int_summed:
+            arr_present = arr_count > 0
+            if str_gap_policy == "nan":
+                arr_sum[arr_count < int_summed] = np.nan
+            elif str_gap_policy == "intersection":
+                arr_present = arr_count == int_summed
+                if not arr_present.any():
+                    return ts.create_standard_time_series(
+                        self.arr_time[arr_present], arr_sum[arr_present])
+            list_rows_ts.append(ts.create_standard_time_series(
+                self.arr_time[arr_present], arr_sum[arr_present]))
+        return ts.add_many(
+            itertools.chain(list_rows_ts, (
+                self.dict_detached[str_ID] for str_ID in list_IDs
+                if str_ID in self.dict_detached)),
+            str_gap_policy)
+
+    def __getitem__(self, str_ID):
+        if str_ID in self.dict_index:
+            arr_row = self.arr_loads[self.dict_index[str_ID]]
+            arr_present = ~np.isnan(arr_row)
+            ts_load = ts.create_standard_time_series(
+                self.arr_time[arr_present], arr_row[arr_present])
+            ts_load._dict_resampled = self.dict_resampled.setdefault(
+                str_ID, {})
+            return ts_load
+        return self.dict_detached[str_ID]
+
+    def __setitem__(self, str_ID, ts_load):
+        self.dict_resampled.pop(str_ID, None)
+        if isinstance(ts_load, ts.Timeseries) and ts_load.is_shared():
+            if str_ID in self.dict_index:
+                del self[str_ID]
+            self.dict_detached[str_ID] = ts.deduplicate_timeseries(
+                ts_load, self.dict_shared_arrays)
+            return
+
+        arr_time = datetime_array_of_timeseries(ts_load)
+        arr_columns = None
+        if arr_time is not None and len(self.arr_time) > 0:
+            arr_columns = np.searchsorted(self.arr_time, arr_time)
+            arr_columns[arr_columns == len(self.arr_time)] = 0
+            if not np.array_equal(self.arr_time[arr_columns], arr_time):
+                arr_columns = None
+
+        if arr_columns is None:
+            if str_ID in self.dict_index:
+                del self[str_ID]
+            self.dict_detached[str_ID] = ts_load
+            return
+
+        int_row = self.get_or_add_row(str_ID)
+        arr_row = self.arr_loads[int_row]
+        arr_row[:] = np.nan
+        arr_row[arr_columns] = np.asarray(ts_load[:, 1], dtype=np.float64)
+
+    def __delitem__(self, str_ID):
+        self.dict_resampled.pop(str_ID, None)
+        if str_ID in self.dict_index:
+            # The last row is moved into the freed row, such that no other
+            # rows are shifted
+            int_row = self.dict_index.pop(str_ID)
+            str_last_ID = self.list_row_IDs.pop()
+            if str_last_ID != str_ID:
+                self.arr_loads[int_row] = self.arr_loads[self._int_rows - 1]
+                self.list_row_IDs[int_row] = str_last_ID
+                self.dict_index[str_last_ID] = int_row
+            self._int_rows -= 1
+        else:
+            del self.dict_detached[str_ID]
+
+    def __contains__(self, str_ID):
+        return str_ID in self.dict_index or str_ID in self.dict_detached
+
+    def __iter__(self):
+        yield from list(self.dict_index)
+        yield from list(self.dict_detached)
+
+    def __len__(self):
+        return len(self.dict_index) + len(self.dict_detached)
+
+    def __repr__(self):
+        return ("LoadMatrix of " + str(len(self)) + " load-points on "
+                + str(len(self.arr_time)) + " timestamps")
+
+
+def index_path_of_backing_file(str_backing_path):
+    """Returns path of the file storing time-axis and IDs of a backing file.
+    """
+    str_root, _str_extension = os.path.splitext(str_backing_path)
+    return str_root + "_index.npz"
+
+
+def prepared_path_of_backing_file(str_backing_path):
+    """Returns path of the backing file of the prepared loads.
+
+    Notes
+    ----------
+    Kept apart from str_backing_path, which holds the raw loads when they
+    are streamed, see data_loading.stream_unsplit_txt_into_load_matrix.
+    """
+    str_root, str_extension = os.path.splitext(str_backing_path)
+    return str_root + "_prepared" + str_extension
+
+
+def datetime_array_of_timeseries(ts_load):
+    """Returns timestamps of timeseries as datetime64-array.
+
+    Returns
+    ----------
+    arr_time : np.array(datetime64[s])
+        Timestamps of ts_load.
+    None
+        If ts_load is empty or its timestamps are not dates.
+    """
+    if len(ts_load) == 0:
+        return None
+    if isinstance(ts_load, ts.Timeseries):
+        return ts_load[:, 0].astype("datetime64[s]")
+    if not isinstance(ts_load[0, 0], (dt.datetime, np.datetime64)):
+        return None
+    return np.array(list(ts_load[:, 0]), dtype="datetime64[s]")
+
+
+def load_dtype(dict_data_config):
+    """Returns data-type loads of a [data.*]-section are stored as.
+
+    Notes
+    ----------
+    float32 if the optional field "single_precision" is set, float64
+    otherwise. Sums over loads are accumulated in float64 regardless.
+    """
+    if dict_data_config.get("single_precision", ""):
+        return np.float32
+    return np.float64
+
+
+def path_of_data_file(str_directory, str_key_name):
+    """Returns path of the data-file a loaded timeseries is keyed by.
+
+    Notes
+    ----------
+    Timeseries are keyed by the name of their file without extension, see
+    data_loading.load_data_and_create_timeseries.
+    """
+    for str_file_name in sorted(os.listdir(str_directory)):
+        if os.path.splitext(str_file_name)[0] == str_key_name:
+            return str_directory + str_file_name
+    raise(Exception("Data-file \"" + str_key_name + "\" missing from \""
+                    + str_directory + "\""))
+
+
+def prepare_common_data(dict_config, dict_data):
+    """Prepares data shared by the preprocessing of every load-point.
 
-def prepare_all_loads(dict_config, dict_data):
-    """Prepares nodes based on input data and config.
     Parameters
     ----------
     dict_config : dict
         Configuration-file.
     dict_data : dictionary of measured loads and temperature.
+
+    Returns
+    ----------
+    dict_common_ts : dict
+        Daily normal temperature, n-day average temperature and the hourly
+        time-grid of the loads, keyed as expected by
+        preprocessing.preprocess_data.
+
+    Notes
+    ----------
+    The n-day average is taken over the optional [preprocessing]-fields
+    "temperature_average_days" (default 3) and "temperature_average_weights"
+    (default equal weights), see preprocessing.rolling_average_of_timestamps.
     """
     print("Preparing common data...")
     date_start = dt.date.fromisoformat(
@@ -32,43 +376,161 @@ def prepare_all_loads(dict_config, dict_data):
     date_end = dt.date.fromisoformat(
         dict_config["data"]["load_measurements"]["last_date_iso"])
 
+    dict_temperature_config = dict_config["data"]["temperature_measurements"]
+    dict_preprocessing_config = dict_config["preprocessing"]
     ts_temperature_historical = utilities.get_first_value_of_dictionary(
         dict_data["temperature_measurements"])
     ts_temperature_historical = preprocessing.remove_nan_and_none_datapoints(
         ts_temperature_historical)
-    dict_daily_normal_temperature = preprocessing.compute_daily_historical_normal(
-        ts_temperature_historical)
-    dict_temperature_n_day_average = preprocessing.create_n_day_average_dict(
-        ts_temperature_historical,
-        date_start, date_end,  n=3)
+    arr_daily_normal_temperature = \
+        preprocessing.load_or_compute_daily_historical_normal(
+            ts_temperature_historical,
+            dict_temperature_config.get(
+                "cache_path", parse_cache.STR_DEFAULT_CACHE_PATH),
+            path_of_data_file(
+                dict_temperature_config["path"],
+                next(iter(dict_data["temperature_measurements"]))),
+            dict_temperature_config)
+    arr_grid = ts.create_hourly_time_axis(date_start, date_end)
+    arr_temperature_n_day_average = preprocessing.rolling_average_of_timestamps(
+        ts_temperature_historical, arr_grid,
+        dict_preprocessing_config.get("temperature_average_days", 3),
+        dict_preprocessing_config.get("temperature_average_weights", None))
 
-    print("Preparing all loads in network...")
-    # Preprocessing and potential modelling of every load-point
-    dict_loads_ts = {}
-    for str_node_ID in dict_data["load_measurements"]:
-        print("--------------------")
-        print("Preparing load-point", str_node_ID + "...")
+    dict_common_ts = {}
+    dict_common_ts["normal_temperature"] = arr_daily_normal_temperature
+    dict_common_ts["n-day_average_temperature"] = ts.create_standard_time_series(
+        arr_grid, arr_temperature_n_day_average)
+    dict_common_ts["hourly_grid"] = arr_grid
+    return dict_common_ts
 
-        dict_node_ts = {}
+
+def prepare_load(str_node_ID, dict_config, dict_data, dict_common_ts,
+                 dict_node_ts=None):
+    """Preprocesses and potentially models a single load-point.
+
+    Parameters
+    ----------
+    str_node_ID : str
+        ID of load-point to prepare.
+    dict_config : dict
+        Configuration-file.
+    dict_data : dictionary of measured loads and temperature.
+    dict_common_ts : dict
+        Data shared by all load-points, see prepare_common_data.
+    dict_node_ts : dict, optional
+        Already preprocessed data of str_node_ID, see
+        preprocessing.preprocess_load_matrix. Preprocessed here if left out.
+
+    Returns
+    ----------
+    ts_load : timeseries
+        Prepared load of str_node_ID.
+    """
+    print("--------------------")
+    print("Preparing load-point", str_node_ID + "...")
+
+    if dict_node_ts is None:
+        dict_node_ts = dict(dict_common_ts)
         dict_node_ts["load_measurements"] = dict_data["load_measurements"][str_node_ID]
-        dict_node_ts["normal_temperature"] = dict_daily_normal_temperature
-        dict_node_ts["n-day_average_temperature"] = dict_temperature_n_day_average
 
         print("Preprocessing", str_node_ID + "...")
         dict_node_ts = preprocessing.preprocess_data(
             dict_config["preprocessing"], dict_node_ts)
 
-        if dict_config["modelling"]["perform_modelling"]:
-            print("Modelling based on dataset", str_node_ID + "...")
-            dict_model = modelling.model_load(
-                dict_config["modelling"], dict_node_ts)
-            dict_loads_ts[str_node_ID] = dict_model["load"]
-        else:
-            dict_loads_ts[str_node_ID] = dict_node_ts["load"]
+    if dict_config["modelling"]["perform_modelling"]:
+        print("Modelling based on dataset", str_node_ID + "...")
+        dict_model = modelling.model_load(
+            dict_config["modelling"], dict_node_ts)
+        ts_load = dict_model["load"]
+    else:
+        ts_load = dict_node_ts["load"]
+    return ts.create_standard_time_series(
+        ts_load[:, 0], ts_load[:, 1],
+        load_dtype(dict_config["data"]["load_measurements"]))
+
+
+def prepare_all_loads(dict_config, dict_data):
+    """Prepares nodes based on input data and config.
+    Parameters
+    ----------
+    dict_config : dict
+        Configuration-file.
+    dict_data : dictionary of measured loads and temperature.
+
+    Returns
+    ----------
+    lm_loads : LoadMatrix or LazyDict
+        Prepared load of every load-point, keyed by ID.
+
+    Notes
+    ----------
+    The loads are memory-mapped to a .npy-file next to the optional field
+    "backing_file" of [data.load_measurements], see
+    prepared_path_of_backing_file, and held in memory if it is left out or
+    empty. They are stored as float32 if "single_precision" is
+    set, see load_dtype.
+
+    The load-matrix is laid out on the hourly grid of the loads before
+    preparation, and every load-point is written to its row as soon as it is
+    prepared, such that besides the matrix only the load-point being
+    prepared is held.
+
+    If "lazy_loading" of [data.load_measurements] is set, a LazyDict is
+    returned instead, which prepares each load-point on first access. The
+    common data is then prepared together with the first load-point.
+
+    Otherwise, if "preprocess_as_matrix" of [preprocessing] is set, all
+    load-points are preprocessed in one pass, see
+    preprocessing.preprocess_load_matrix. The preprocessed loads are then
+    held once more in that matrix until all load-points are prepared, and
+    split into timeseries one load-point at a time.
+    """
+    if dict_config["data"]["load_measurements"].get("lazy_loading", ""):
+        print("Deferring preparation of loads until they are accessed...")
+        dict_common_ts = {}
+
+        def fn_prepare_load(str_node_ID):
+            if not dict_common_ts:
+                dict_common_ts.update(
+                    prepare_common_data(dict_config, dict_data))
+            return prepare_load(
+                str_node_ID, dict_config, dict_data, dict_common_ts)
+
+        return utilities.LazyDict(
+            list(dict_data["load_measurements"]), fn_prepare_load)
+
+    dict_common_ts = prepare_common_data(dict_config, dict_data)
+
+    if dict_config["preprocessing"].get("preprocess_as_matrix", ""):
+        iter_nodes_ts = preprocessing.preprocess_load_matrix(
+            dict_config["preprocessing"], dict_data["load_measurements"],
+            dict_common_ts)
+    else:
+        iter_nodes_ts = ((str_node_ID, None)
+                         for str_node_ID in dict_data["load_measurements"])
+
+    str_backing_path = dict_config["data"]["load_measurements"].get(
+        "backing_file", "")
+    if str_backing_path:
+        str_backing_path = prepared_path_of_backing_file(str_backing_path)
+    lm_loads = LoadMatrix(
+        dict_common_ts["hourly_grid"],
+        dtype=load_dtype(dict_config["data"]["load_measurements"]),
+        str_backing_path=str_backing_path)
+    lm_loads._reserve_rows(len(dict_data["load_measurements"]))
+
+    print("Preparing all loads in network...")
+    # Preprocessing and potential modelling of every load-point
+    for str_node_ID, dict_node_ts in iter_nodes_ts:
+        lm_loads[str_node_ID] = prepare_load(
+            str_node_ID, dict_config, dict_data, dict_common_ts,
+            dict_node_ts)
 
     print("--------------------")
     print("Successfully prepared all load-points")
-    return dict_loads_ts
+    lm_loads.flush()
+    return lm_loads
 
 
 def add_new_load(dict_loads_ts, str_new_load_ID, ts_new_load_data):
@@ -48,7 +48,7 @@ def interactively_copy_existing_load(dict_loads_ts):
 
     print("Input ID of node you want to copy")
     str_ID = load_points.input_until_node_in_load_points_appears(dict_loads_ts)
-    ts_new_load_data = copy.deepcopy(dict_loads_ts[str_ID])
+    ts_new_load_data = ts.clone_timeseries(dict_loads_ts[str_ID])
 
     return ts_new_load_data
 
@@ -213,6 +213,7 @@ def interactively_increase_loads_in_net(dict_loads_ts):
 
             ts_new_load = ts.offset_timeseries(
                 dict_loads_ts[str_ID], fl_increase)
+            dict_loads_ts[str_ID] = ts_new_load
 
             print(str_ID, "after increase")
             load_points.graphically_represent_load_point(ts_new_load)
@@ -224,6 +225,7 @@ def interactively_increase_loads_in_net(dict_loads_ts):
             if not bool_correct_new_load:
                 ts_new_load = ts.offset_timeseries(
                     dict_loads_ts[str_ID], -fl_increase)
+                dict_loads_ts[str_ID] = ts_new_load
                 
                 print("Retry increasing load or abort?")
                 str_choice = utilities.input_until_acceptable_response(["r", "a"])
@@ -1,35 +1,623 @@
+import hashlib
 import numpy as np
-import utilities
 
-def create_standard_time_series(arr_time_dt, arr_data):
+
+class Timeseries:
+    """Timeseries of float-values at hourly timestamps.
+
+    Attributes
+    ----------
+    arr_time : np.array(datetime64[h])
+        Timestamps, one per datapoint.
+    arr_data : np.array(float)
+        Data-values, one per timestamp.
+    fl_scale, fl_offset : float
+        Transform applied to the stored values when they are read, such that
+        arr_data is the stored values times fl_scale plus fl_offset.
+
+    Notes
+    ----------
+    Indexes like the former (n, 2) timeseries-arrays of [datetime, float],
+    such that ts[:, 0] returns the timestamps and ts[:, 1] the data-values,
+    both as arrays of native dtype. Indexing a single timestamp, ts[i, 0],
+    returns a datetime, and indexing a single datapoint, ts[i] or ts[i, :],
+    returns a tuple of (datetime, float). Any other row-index returns a
+    Timeseries of the selected datapoints.
+
+    Timestamps must be whole hours, finer timestamps raise an Exception
+    rather than being truncated into duplicate hours.
+
+    A timeseries created by clone_timeseries shares its arrays with the
+    timeseries it was cloned from. Shared arrays are read-only, and are
+    copied, with the transform applied, on the first write to either
+    timeseries. Columns of a shared timeseries are therefore indexed as
+    writable copies, such that in-place operators, i.e. ts[:, 1] += x, write
+    back through indexing and copy the arrays there. Scaling and offsetting a
+    shared timeseries through scale_timeseries and offset_timeseries only
+    changes its transform, and copy.deepcopy gives a timeseries of its own.
+
+    Resampled levels, see resample_timeseries, are cached on the timeseries
+    until it is written to through indexing.
+    """
+
+    __slots__ = ("arr_time", "_arr_values", "fl_scale", "fl_offset",
+                 "_bool_shared", "_dict_resampled")
+
+    def __init__(self, arr_time, arr_data, dtype=None):
+        arr_time = np.asarray(arr_time)
+        if arr_time.dtype.kind != "M":
+            arr_time = arr_time.astype("datetime64[us]")
+        self.arr_time = arr_time.astype("datetime64[h]")
+        if arr_time.dtype != self.arr_time.dtype \
+                and (self.arr_time[~np.isnat(arr_time)]
+                     != arr_time[~np.isnat(arr_time)]).any():
+            raise Exception("Timestamps of timeseries must be whole hours, "
+                            + "got sub-hourly timestamps")
+        if dtype is None:
+            dtype = np.asarray(arr_data).dtype
+            if not np.issubdtype(dtype, np.floating):
+                dtype = np.float64
+        self.arr_data = np.asarray(arr_data, dtype=dtype)
+        if self.arr_time.shape != self.arr_data.shape:
+            raise Exception("Timestamps and data-values of timeseries must "
+                            + "be of same length")
+
+    @property
+    def arr_data(self):
+        return self._transformed(slice(None))
+
+    @arr_data.setter
+    def arr_data(self, arr_data):
+        self._arr_values = arr_data
+        self.fl_scale = 1.0
+        self.fl_offset = 0.0
+        self._bool_shared = False
+        self._dict_resampled = {}
+
+    @property
+    def shape(self):
+        return (len(self.arr_time), 2)
+
+    @property
+    def size(self):
+        return 2 * len(self.arr_time)
+
+    @property
+    def dtype(self):
+        return self._arr_values.dtype
+
+    def copy(self):
+        return Timeseries(self.arr_time.copy(), np.array(self.arr_data))
+
+    def __deepcopy__(self, dict_memo):
+        return self.copy()
+
+    def is_shared(self):
+        """Returns whether the arrays are shared with other timeseries.
+        """
+        return self._bool_shared
+
+    def _is_transformed(self):
+        return self.fl_scale != 1.0 or self.fl_offset != 0.0
+
+    def _transformed(self, row):
+        """Returns stored values at row with the transform applied.
+
+        Notes
+        ----------
+        Shared values are returned as a copy, see Timeseries.
+        """
+        arr_values = self._arr_values[row]
+        if self._is_transformed():
+            return (arr_values * self.fl_scale + self.fl_offset).astype(
+                self._arr_values.dtype, copy=False)
+        if self._bool_shared and isinstance(arr_values, np.ndarray):
+            return arr_values.copy()
+        return arr_values
+
+    def _materialize(self):
+        """Gives the timeseries arrays of its own, before it is written to.
+        """
+        if not self._bool_shared and not self._is_transformed():
+            return
+        arr_data = np.array(self.arr_data)
+        if self._bool_shared:
+            self.arr_time = self.arr_time.copy()
+        self.arr_data = arr_data
+
+    def _split_key(self, key):
+        """Splits index into row-index and column, where None is both columns.
+        """
+        if not isinstance(key, tuple):
+            return key, None
+        if len(key) != 2:
+            raise IndexError("Timeseries takes at most two indices")
+        row, column = key
+        if isinstance(column, slice) and column == slice(None):
+            return row, None
+        if column in (0, 1, -1, -2):
+            return row, column % 2
+        raise IndexError("Column of timeseries must be 0, 1 or :")
+
+    def __getitem__(self, key):
+        row, column = self._split_key(key)
+        if isinstance(row, list):
+            row = np.asarray(row)
+        if column == 0:
+            if isinstance(row, (int, np.integer)):
+                return self.arr_time[row].item()
+            if self._bool_shared:
+                return self.arr_time[row].copy()
+            return self.arr_time[row]
+        if column == 1:
+            return self._transformed(row)
+        if isinstance(row, (int, np.integer)):
+            return (self.arr_time[row].item(), self._transformed(row))
+        return Timeseries(self.arr_time[row], np.array(self._transformed(row)))
+
+    def __setitem__(self, key, value):
+        row, column = self._split_key(key)
+        if isinstance(row, list):
+            row = np.asarray(row)
+        self._materialize()
+        self._dict_resampled = {}
+        if column == 0:
+            self.arr_time[row] = value
+        elif column == 1:
+            self._arr_values[row] = value
+        elif isinstance(value, Timeseries):
+            self.arr_time[row] = value.arr_time
+            self._arr_values[row] = value.arr_data
+        else:
+            self.arr_time[row] = value[0]
+            self._arr_values[row] = value[1]
+
+    def __len__(self):
+        return len(self.arr_time)
+
+    def __iter__(self):
+        for i in range(len(self.arr_time)):
+            yield (self.arr_time[i].item(), self._transformed(i))
+
+    def __repr__(self):
+        if not len(self.arr_time):
+            return "Timeseries of 0 datapoints"
+        return ("Timeseries of " + str(len(self.arr_time)) + " datapoints from "
+                + str(self.arr_time[0]) + " to " + str(self.arr_time[-1]))
+
+
+def create_standard_time_series(arr_time_dt, arr_data, dtype=None):
     """Returns timeseries on standardized format
 
     Parameters
     ----------
     arr_time_dt : np.array
-        Array of timestamps.
+        Array of timestamps, either datetimes or datetime64.
     arr_data : np.arrary
         Array of data associated to the timestamps.
+    dtype : np.dtype, optional
+        Data-type to store the data as, defaults to that of arr_data if it
+        is floating and float64 otherwise.
 
     Returns
     ----------
-    timeseries = np.array([datetime, float])
-        Timeseries-array.
+    timeseries : Timeseries
+        Timeseries of the data.
 
     Notes
     ----------
     "Standardized" here means that the timeseries is formatted vertically, 
     such that array[i] accesses the ith datapoint.
     """
-    return np.transpose(np.array([arr_time_dt, arr_data]))
+    return Timeseries(arr_time_dt, arr_data, dtype)
+
+
+def create_hourly_time_axis(date_start, date_end):
+    """Returns every hour from the start of one date to the end of another.
+
+    Parameters
+    ----------
+    date_start, date_end : date
+        First and last (inclusive) date of the time-axis.
+
+    Returns
+    ----------
+    arr_time : np.array(datetime64[s])
+        Hourly timestamps from 00:00 of date_start to 23:00 of date_end.
+    """
+    return np.arange(
+        np.datetime64(date_start, 'D'),
+        np.datetime64(date_end, 'D') + np.timedelta64(1, 'D'),
+        np.timedelta64(1, 'h')).astype('datetime64[s]')
+
+
+LIST_RESAMPLING_PERIODS = ["day", "week", "month"]
+LIST_RESAMPLING_REDUCTIONS = ["sum", "mean", "max", "min", "count"]
+
+
+def period_start_of_timestamps(arr_time, str_period):
+    """Returns the first date of the period each timestamp is within.
+
+    Parameters
+    ----------
+    arr_time : np.array(datetime64)
+        Timestamps.
+    str_period : str
+        "day", "week" or "month". Weeks start on mondays.
+
+    Returns
+    ----------
+    arr_period : np.array(datetime64[D])
+        First date of the period of every timestamp.
+    """
+    arr_day = np.asarray(arr_time).astype("datetime64[D]")
+    if str_period == "day":
+        return arr_day
+    elif str_period == "week":
+        # 1970-01-01, day 0, is a thursday, i.e. weekday 3
+        arr_days = arr_day.astype(np.int64)
+        return (arr_days - (arr_days + 3) % 7).astype("datetime64[D]")
+    elif str_period == "month":
+        return arr_day.astype("datetime64[M]").astype("datetime64[D]")
+    raise Exception("Unsupported resampling period \"" + str(str_period)
+                    + "\", expected one of " + str(LIST_RESAMPLING_PERIODS))
+
+
+def resample_timeseries(ts, str_period, str_reduction):
+    """Returns timeseries reduced to one datapoint per day, week or month.
+
+    Parameters
+    ----------
+    ts : Timeseries
+        Timeseries to resample.
+    str_period : str
+        "day", "week" or "month", see period_start_of_timestamps.
+    str_reduction : str
+        "sum", "mean", "max", "min" or "count" of the datapoints within each
+        period.
+
+    Returns
+    ----------
+    ts_resampled : Timeseries
+        Reduced datapoints, timestamped at the start of their period.
+        Periods without datapoints are left out.
+
+    Notes
+    ----------
+    Levels are built as a pyramid: weeks and months are reduced from the
+    daily level, and means from sums and counts. Every level is cached on
+    ts, such that repeated queries, also of coarser levels, do not rescan
+    the raw data.
+    """
+    if str_reduction not in LIST_RESAMPLING_REDUCTIONS:
+        raise Exception("Unsupported resampling reduction \""
+                        + str(str_reduction) + "\", expected one of "
+                        + str(LIST_RESAMPLING_REDUCTIONS))
+    # Keyed by transform as well, since it is changed without writing
+    tup_key = (str_period, str_reduction, ts.fl_scale, ts.fl_offset)
+    if tup_key in ts._dict_resampled:
+        return clone_timeseries(ts._dict_resampled[tup_key])
+
+    if str_reduction == "mean":
+        ts_sum = resample_timeseries(ts, str_period, "sum")
+        ts_count = resample_timeseries(ts, str_period, "count")
+        ts_resampled = Timeseries(ts_sum[:, 0], ts_sum[:, 1] / ts_count[:, 1])
+    elif str_period == "day":
+        ts_resampled = _reduce_by_period(
+            ts[:, 0], ts[:, 1], str_period, str_reduction)
+    else:
+        ts_daily = resample_timeseries(ts, "day", str_reduction)
+        str_daily_reduction = str_reduction
+        if str_reduction == "count":
+            str_daily_reduction = "sum"
+        ts_resampled = _reduce_by_period(
+            ts_daily[:, 0], ts_daily[:, 1], str_period, str_daily_reduction)
+
+    ts._dict_resampled[tup_key] = ts_resampled
+    return clone_timeseries(ts_resampled)
+
+
+def resample_to_resolution(ts, int_min_datapoints, str_reduction="max"):
+    """Returns the coarsest resampled level fine enough to show a timeseries.
+
+    Parameters
+    ----------
+    ts : Timeseries
+        Timeseries to resample.
+    int_min_datapoints : int
+        Least amount of datapoints the level must have, 0 for the datapoints
+        of ts as they are.
+    str_reduction : str, default="max"
+        Reduction of the level, see resample_timeseries.
+
+    Returns
+    ----------
+    ts_level : Timeseries
+        Coarsest of the monthly, weekly and daily level of ts with at least
+        int_min_datapoints datapoints, or ts itself if none has.
+    """
+    if int_min_datapoints <= 0:
+        return ts
+    ts_level = ts
+    for str_period in LIST_RESAMPLING_PERIODS:
+        ts_coarser = resample_timeseries(ts, str_period, str_reduction)
+        if len(ts_coarser) < int_min_datapoints:
+            break
+        ts_level = ts_coarser
+    return ts_level
+
+
+def _reduce_by_period(arr_time, arr_values, str_period, str_reduction):
+    """Reduces values sharing period with one ufunc.reduceat-call.
+    """
+    arr_period = period_start_of_timestamps(arr_time, str_period)
+    arr_values = np.asarray(arr_values, dtype=np.float64)
+    if len(arr_period) == 0:
+        return Timeseries(arr_period, arr_values)
+    if np.any(arr_period[1:] < arr_period[:-1]):
+        arr_order = np.argsort(arr_period, kind="stable")
+        arr_period = arr_period[arr_order]
+        arr_values = arr_values[arr_order]
+
+    arr_starts = np.flatnonzero(
+        np.concatenate(([True], arr_period[1:] != arr_period[:-1])))
+    if str_reduction == "count":
+        arr_reduced = np.diff(
+            np.append(arr_starts, len(arr_values))).astype(np.float64)
+    else:
+        ufunc = {"sum": np.add, "max": np.maximum, "min": np.minimum}[
+            str_reduction]
+        arr_reduced = ufunc.reduceat(arr_values, arr_starts)
+    return Timeseries(arr_period[arr_starts], arr_reduced)
+
+
+def clone_timeseries(ts_source):
+    """Returns timeseries sharing the arrays of another timeseries.
+
+    Parameters
+    ----------
+    ts_source : Timeseries
+        Timeseries to clone.
+
+    Returns
+    ----------
+    ts_clone : Timeseries
+        Timeseries equal to ts_source, with the same transform.
+
+    Notes
+    ----------
+    Both timeseries are marked as shared, such that a write to either
+    copies the arrays first, see Timeseries. Until then the clone costs no
+    memory beyond the timeseries-object itself.
+    """
+    ts_source._arr_values = _read_only_view(ts_source._arr_values)
+    ts_source.arr_time = _read_only_view(ts_source.arr_time)
+    ts_source._bool_shared = True
+
+    ts_clone = Timeseries.__new__(Timeseries)
+    ts_clone.arr_time = ts_source.arr_time
+    ts_clone._arr_values = ts_source._arr_values
+    ts_clone.fl_scale = ts_source.fl_scale
+    ts_clone.fl_offset = ts_source.fl_offset
+    ts_clone._bool_shared = True
+    # Levels of equal arrays and transform are equal, and are not cleared
+    # but replaced on writes
+    ts_clone._dict_resampled = ts_source._dict_resampled
+    return ts_clone
+
+
+def deduplicate_timeseries(ts_shared, dict_shared_arrays):
+    """Makes a shared timeseries use arrays identical to its own, if any.
+
+    Parameters
+    ----------
+    ts_shared : Timeseries
+        Timeseries whose arrays are shared, see clone_timeseries.
+    dict_shared_arrays : weakref.WeakValueDictionary
+        Shared arrays keyed by digest of their contents. Arrays of ts_shared
+        are added if no identical array is present.
+
+    Returns
+    ----------
+    ts_shared : Timeseries
+        Input timeseries, now referring to the arrays of dict_shared_arrays.
+
+    Notes
+    ----------
+    Lets copies of the same load, cloned from separately accessed
+    timeseries, be stored once.
+    """
+    ts_shared.arr_time = _shared_array(ts_shared.arr_time, dict_shared_arrays)
+    ts_shared._arr_values = _shared_array(
+        ts_shared._arr_values, dict_shared_arrays)
+    return ts_shared
+
+
+def _read_only_view(arr):
+    if not arr.flags.writeable:
+        return arr
+    arr_view = arr.view()
+    arr_view.flags.writeable = False
+    return arr_view
+
+
+def _shared_array(arr, dict_shared_arrays):
+    """Returns array of dict_shared_arrays identical to arr, adding arr if new.
+    """
+    str_digest = (str(arr.dtype) + str(arr.shape)
+                  + hashlib.sha1(np.ascontiguousarray(arr).tobytes()).hexdigest())
+    arr_shared = dict_shared_arrays.get(str_digest)
+    if arr_shared is not None and np.array_equal(arr_shared, arr):
+        return arr_shared
+    arr = _read_only_view(arr)
+    dict_shared_arrays[str_digest] = arr
+    return arr
+
+
+LIST_INTERPOLATION_METHODS = ["linear", "previous", "zero", "nan"]
+
+
+def reindex_timeseries(ts, arr_grid, str_interpolation="linear",
+                       int_max_gap_hours=0):
+    """Returns timeseries on a given time-grid, filling gaps by interpolation.
+
+    Parameters
+    ----------
+    ts : Timeseries
+        Timeseries to reindex, sorted by time and without NaN.
+    arr_grid : np.array(datetime64)
+        Sorted timestamps to reindex onto, e.g. create_hourly_time_axis.
+    str_interpolation : str, default="linear"
+        How to fill timestamps of arr_grid missing from ts: "linear"
+        interpolates between the neighbouring datapoints, "previous" repeats
+        the previous datapoint, "zero" inserts zero and "nan" inserts NaN.
+    int_max_gap_hours : int, default=0
+        Gaps of more missing hours than this are left as NaN, 0 meaning no
+        limit. Gaps before the first and after the last datapoint are
+        counted to the ends of arr_grid.
+
+    Returns
+    ----------
+    ts_reindexed : Timeseries
+        Timeseries with one datapoint per timestamp of arr_grid.
+
+    Notes
+    ----------
+    Datapoints of ts not on arr_grid are left out. "linear" and "previous"
+    hold the first and last datapoint beyond the ends of ts.
+    """
+    if str_interpolation not in LIST_INTERPOLATION_METHODS:
+        raise Exception("Unsupported interpolation method \""
+                        + str(str_interpolation) + "\", expected one of "
+                        + str(LIST_INTERPOLATION_METHODS))
+    arr_grid = np.asarray(arr_grid).astype("datetime64[h]")
+    arr_time = ts[:, 0]
+    arr_values = np.asarray(ts[:, 1], dtype=np.float64)
+    arr_reindexed = np.full(len(arr_grid), np.nan)
+    if len(arr_time) == 0:
+        if str_interpolation == "zero":
+            arr_reindexed[:] = 0
+        return Timeseries(arr_grid, arr_reindexed, ts.dtype)
+
+    # Index of the first datapoint at or after, and last before, every
+    # timestamp of the grid
+    arr_next = np.searchsorted(arr_time, arr_grid, side="left")
+    arr_previous = np.searchsorted(arr_time, arr_grid, side="right") - 1
+    arr_found = arr_previous >= arr_next
+    arr_reindexed[arr_found] = arr_values[arr_previous[arr_found]]
+    arr_missing = ~arr_found
 
+    if str_interpolation == "linear":
+        arr_reindexed[arr_missing] = np.interp(
+            arr_grid[arr_missing].astype(np.int64),
+            arr_time.astype(np.int64), arr_values)
+    elif str_interpolation == "previous":
+        arr_reindexed[arr_missing] = arr_values[
+            np.maximum(arr_previous[arr_missing], 0)]
+    elif str_interpolation == "zero":
+        arr_reindexed[arr_missing] = 0
 
-def add_timeseries(ts_a, ts_b):
+    if int_max_gap_hours > 0:
+        arr_leading = arr_previous < 0
+        arr_trailing = arr_next >= len(arr_time)
+        arr_inside = arr_missing & ~arr_leading & ~arr_trailing
+        arr_gap_hours = np.zeros(len(arr_grid), dtype=np.int64)
+        arr_gap_hours[arr_inside] = (
+            arr_time[arr_next[arr_inside]]
+            - arr_time[arr_previous[arr_inside]]).astype(np.int64) - 1
+        arr_gap_hours[arr_leading] = (arr_time[0] - arr_grid[0]).astype(np.int64)
+        arr_gap_hours[arr_trailing] = (arr_grid[-1] - arr_time[-1]).astype(np.int64)
+        arr_reindexed[arr_missing & (arr_gap_hours > int_max_gap_hours)] = np.nan
+    return Timeseries(arr_grid, arr_reindexed, ts.dtype)
+
+
+LIST_GAP_POLICIES = ["zero", "nan", "intersection"]
+
+
+def add_many(iter_ts, str_gap_policy="zero"):
+    """Returns the sum of data-values in several timeseries.
+
+    Parameters
+    ----------
+    iter_ts : iterable(timeseries)
+        Timeseries to sum, i.e. a list or generator. Empty timeseries are
+        ignored.
+    str_gap_policy : str, default="zero"
+        How to treat timestamps missing from some of the timeseries:
+        "zero" sums the datapoints which are present, "nan" sets the sum to
+        NaN and "intersection" leaves the timestamp out of the sum.
+
+    Returns
+    ----------
+    ts_sum : Timeseries
+        Sum on the sorted union of the timestamps of all input timeseries.
+
+    Notes
+    ----------
+    The timeseries are accumulated one at a time into a single output-array,
+    such that only the sum and the timeseries being added are held. While
+    the timeseries share the timestamps of the sum, the data-values are
+    added directly. Otherwise the sum is widened to the union of the
+    timestamps, and the timeseries is added by its sorted positions in it.
+    """
+    if str_gap_policy not in LIST_GAP_POLICIES:
+        raise Exception("Unsupported gap policy \"" + str(str_gap_policy)
+                        + "\", expected one of " + str(LIST_GAP_POLICIES))
+    arr_time_sum = None
+    int_summed = 0
+    bool_mismatch = False
+    for ts in iter_ts:
+        if ts.size == 0:
+            continue
+        arr_time = np.asarray(ts[:, 0]).astype("datetime64[h]")
+        int_summed += 1
+        if arr_time_sum is None:
+            arr_time_sum = arr_time
+            arr_sum = np.array(ts[:, 1], dtype=np.float64)
+            arr_count = np.ones(len(arr_sum), dtype=int)
+            continue
+        if np.array_equal(arr_time_sum, arr_time):
+            arr_sum += ts[:, 1]
+            arr_count += 1
+            continue
+
+        if not bool_mismatch:
+            print("Warning: Mismatching timestamps when adding timeseries!")
+            bool_mismatch = True
+        arr_time_union = np.union1d(arr_time_sum, arr_time)
+        if len(arr_time_union) != len(arr_time_sum):
+            arr_index = np.searchsorted(arr_time_union, arr_time_sum)
+            arr_sum_union = np.zeros(len(arr_time_union))
+            arr_sum_union[arr_index] = arr_sum
+            arr_count_union = np.zeros(len(arr_time_union), dtype=int)
+            arr_count_union[arr_index] = arr_count
+            arr_time_sum = arr_time_union
+            arr_sum = arr_sum_union
+            arr_count = arr_count_union
+        arr_index = np.searchsorted(arr_time_sum, arr_time)
+        np.add.at(arr_sum, arr_index, np.asarray(ts[:, 1], dtype=np.float64))
+        arr_count[np.unique(arr_index)] += 1
+
+    if arr_time_sum is None:
+        return Timeseries(np.empty(0, dtype="datetime64[h]"), np.empty(0))
+    arr_complete = (arr_count == int_summed)
+    if str_gap_policy == "nan":
+        arr_sum[~arr_complete] = np.nan
+    elif str_gap_policy == "intersection":
+        arr_time_sum = arr_time_sum[arr_complete]
+        arr_sum = arr_sum[arr_complete]
+    return Timeseries(arr_time_sum, arr_sum)
+
+
+def add_timeseries(ts_a, ts_b, str_gap_policy="zero"):
     """Returns the sum of data-values in two timeseries
 
     Parameters:
     ----------
     ts_a, ts_b : timeseries
+    str_gap_policy : str, default="zero"
+        How to treat timestamps missing from one of the timeseries, see
+        add_many.
 
     Returns:
     ----------
@@ -41,50 +629,38 @@ def add_timeseries(ts_a, ts_b):
     This function will cause skewing if both datasets contain similar amount of
     missing datapoints.
 
-    The function will amend non-equally sized timeseries by searching for
-    matching timestamps.
+    The function will amend non-equally sized timeseries by matching
+    timestamps.
 
     """
-    if not ts_a.size > 0:
-        return ts_b
-    if not ts_b.size > 0:
-        return ts_a
-
-    if len(ts_a) != len(ts_b):
-        print("Warning: Mismatching length when adding timeseries!")
-
-        if len(ts_a[:, 0]) < len(ts_b[:, 0]):
-            ts_shortest, ts_longest = ts_a, ts_b
-        else:
-            ts_shortest, ts_longest = ts_b, ts_a
-        int_first_index = utilities.first_matching_index(
-            ts_longest[:, 0],
-            lambda dt: dt == ts_shortest[0, 0])
-        ts_first_part_of_sum = ts_longest[:int_first_index, :]
-        ts_second_part_of_sum = add_timeseries(
-            ts_shortest,
-            ts_longest[int_first_index:, :])
-        ts_sum = np.concatenate((ts_first_part_of_sum,
-                                ts_second_part_of_sum),
-                                axis=0)
-
-    else:
-        arr_time = ts_a[:, 0]
-        arr_data = ts_a[:, 1] + ts_b[:, 1]
-        ts_sum = np.transpose(np.array([arr_time, arr_data]))
-    return ts_sum
+    return add_many([ts_a, ts_b], str_gap_policy)
 
 
 def offset_timeseries(ts, fl):
     """Offsets all datapoints in a timeseries by some number.
+
+    Notes
+    ----------
+    Shared timeseries are offset through their transform, without copying.
     """
+    if isinstance(ts, Timeseries) and ts.is_shared():
+        ts.fl_offset += fl
+        return ts
     ts[:, 1] += fl
     return ts
 
 
 def scale_timeseries(ts, fl):
     """Scales all datapoints in a timeseries by some number.
+
+    Notes
+    ----------
+    Shared timeseries are scaled through their transform, without copying.
     """
+    if isinstance(ts, Timeseries) and ts.is_shared():
+        ts.fl_scale *= fl
+        ts.fl_offset *= fl
+        return ts
     ts[:,1] *= fl
     return ts
 
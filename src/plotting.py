@@ -7,13 +7,29 @@ import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 from calendar import month_abbr
 import utilities as util
+import objects.timeseries as timeseries
 from flexibility.flexibility_need import metric_annotation
 
+# Least amount of datapoints plotted per timeseries, about the width of a
+# figure in pixels
+INT_PLOT_RESOLUTION = 1000
 
-def plot_timeseries(list_ts, list_labels, str_title, str_xlabel="Date", str_ylabel="Load [kW]", fl_limit=None):
+
+def plot_timeseries(list_ts, list_labels, str_title, str_xlabel="Date", str_ylabel="Load [kW]", fl_limit=None,
+                    int_resolution=INT_PLOT_RESOLUTION, str_reduction="max"):
+    """Plots timeseries in one figure.
+
+    Notes
+    ----------
+    Each timeseries is plotted at the coarsest resampled level with at least
+    int_resolution datapoints, see timeseries.resample_to_resolution, and at
+    full resolution if there is none or int_resolution is 0. Reducing by
+    "max" keeps the peaks visible against fl_limit.
+    """
     fig, ax = plt.subplots(figsize=(10, 6))
     for i in range(len(list_ts)):
-        ts = list_ts[i]
+        ts = timeseries.resample_to_resolution(
+            list_ts[i], int_resolution, str_reduction)
         arr_time = ts[:, 0]
         arr_data = ts[:, 1]
         ax.plot(arr_time, arr_data, label=list_labels[i])
@@ -105,15 +121,17 @@ def plot_deterministic_load(ts_deterministic_model, str_variation_value_alternat
     ----------
     Doesn't work as intended.
     """
+    # Timestamps as datetimes, for the weekday- and month-lookups below
+    arr_time_dt = ts_deterministic_model[:, 0].astype(object)
     if str.lower(str_variation_value_alternative) == 'a':
         # Finding the first datapoint on a monday
         int_first_monday_index = util.first_matching_index(
-            ts_deterministic_model[:, 0], lambda dt: dt.weekday() == 0)
+            arr_time_dt, lambda dt: dt.weekday() == 0)
 
         # Finding the second monday
         dt_first = ts_deterministic_model[int_first_monday_index, 0]
         int_second_monday_index = util.first_matching_index(
-            ts_deterministic_model[:, 0], lambda dt: dt.weekday() == 0 and dt.date() != dt_first.date())
+            arr_time_dt, lambda dt: dt.weekday() == 0 and dt.date() != dt_first.date())
 
         fig, ax = plt.subplots(figsize=(10, 6))
         ts = ts_deterministic_model[int_first_monday_index:(
@@ -137,15 +155,15 @@ def plot_deterministic_load(ts_deterministic_model, str_variation_value_alternat
         fig, ax = plt.subplots(figsize=(10, 6))
 
         int_first_monday_index = util.first_matching_index(
-            ts_deterministic_model[:, 0], lambda dt: dt.weekday() == 0)
+            arr_time_dt, lambda dt: dt.weekday() == 0)
         dt_first_monday = ts_deterministic_model[int_first_monday_index, 0]
         int_second_monday_index = util.first_matching_index(
-            ts_deterministic_model[:, 0], lambda dt: dt.weekday() == 0 and dt.date() != dt_first_monday.date())
+            arr_time_dt, lambda dt: dt.weekday() == 0 and dt.date() != dt_first_monday.date())
 
         ts = ts_deterministic_model[int_first_monday_index:(
             int_second_monday_index-1), :]
         arr_time = ts[:, 0]
-        arr_days = [dt.strftime("%A %H:%M:%S") for dt in arr_time]
+        arr_days = [dt.strftime("%A %H:%M:%S") for dt in arr_time.astype(object)]
         arr_data = ts[:, 1]
         ax.plot(arr_days, arr_data, label=dt_first_monday.strftime("%B"))
 
@@ -154,15 +172,15 @@ def plot_deterministic_load(ts_deterministic_model, str_variation_value_alternat
         int_months_plotted = 1
         while int_months_plotted < 12:
             int_first_monday_of_month_index = util.first_matching_index(
-                ts_deterministic_model[int_previous_monday_index:, 0], lambda dt: dt.weekday() == 0 and dt.month != dt_previous_monday.month)
+                arr_time_dt[int_previous_monday_index:], lambda dt: dt.weekday() == 0 and dt.month != dt_previous_monday.month)
             dt_first_monday = ts_deterministic_model[int_first_monday_of_month_index, 0]
             int_second_monday_index = util.first_matching_index(
-                ts_deterministic_model[int_previous_monday_index:, 0], lambda dt: dt.weekday() == 0 and dt.date() != dt_first_monday.date())
+                arr_time_dt[int_previous_monday_index:], lambda dt: dt.weekday() == 0 and dt.date() != dt_first_monday.date())
 
             ts = ts_deterministic_model[int_previous_monday_index+int_first_monday_of_month_index:(
                 int_previous_monday_index+int_second_monday_index-1), :]
             arr_time = ts[:, 0]
-            arr_days = [dt.strftime("%A %H:%M:%S") for dt in arr_time]
+            arr_days = [dt.strftime("%A %H:%M:%S") for dt in arr_time.astype(object)]
             arr_data = ts[:, 1]
             ax.plot(arr_days, arr_data, label=dt_first_monday.strftime("%B"))
 
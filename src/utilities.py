@@ -1,8 +1,65 @@
 import numpy as np
 import datetime as dt
+import collections.abc
 
 # Dictionary utility
 
+class LazyDict(collections.abc.MutableMapping):
+    """Dictionary of values which are created on first access.
+
+    Parameters
+    ----------
+    list_keys : list
+        Keys of the dictionary, in order.
+    fn_load : func
+        Function creating the value of a key, called with the key.
+
+    Notes
+    ----------
+    Created values are memoized. Assigned values replace created ones and
+    are never recreated.
+
+    Keys are held as a dict, which keeps their order while membership is
+    checked in constant time.
+    """
+
+    def __init__(self, list_keys, fn_load):
+        self.dict_keys = dict.fromkeys(list_keys)
+        self.fn_load = fn_load
+        self.dict_loaded = {}
+
+    def is_loaded(self, key):
+        return key in self.dict_loaded
+
+    def __getitem__(self, key):
+        if key not in self.dict_loaded:
+            if key not in self.dict_keys:
+                raise KeyError(key)
+            self.dict_loaded[key] = self.fn_load(key)
+        return self.dict_loaded[key]
+
+    def __setitem__(self, key, value):
+        self.dict_keys[key] = None
+        self.dict_loaded[key] = value
+
+    def __delitem__(self, key):
+        del self.dict_keys[key]
+        self.dict_loaded.pop(key, None)
+
+    def __contains__(self, key):
+        return key in self.dict_keys
+
+    def __iter__(self):
+        return iter(list(self.dict_keys))
+
+    def __len__(self):
+        return len(self.dict_keys)
+
+    def __repr__(self):
+        return ("LazyDict of " + str(len(self)) + " keys, "
+                + str(len(self.dict_loaded)) + " loaded")
+
+
 def print_dictionary_recursive(dictionary, depth=0):
     """Prints a dictionary of nested dictionaries on a nice format.
 
@@ -15,8 +72,11 @@ def print_dictionary_recursive(dictionary, depth=0):
     """
     for key in dictionary:
         print(depth*"\t", key, end=': ')
+        if isinstance(dictionary, LazyDict) and not dictionary.is_loaded(key):
+            print("Not loaded yet")
+            continue
         value = dictionary[key]
-        if isinstance(value, dict):
+        if isinstance(value, collections.abc.Mapping):
             print()
             print_dictionary_recursive(value, depth + 1)
         else:
@@ -94,7 +154,7 @@ def interactively_traverse_nested_dictionary(dict_choices):
             print("Could not find key, try again")
         else:
             bool_successful_input = True
-    if type(dict_choices[str_key]) == dict:
+    if isinstance(dict_choices[str_key], collections.abc.Mapping):
         str_final_key, data = interactively_traverse_nested_dictionary(
             dict_choices[str_key])
     else:
@@ -0,0 +1,51 @@
+import os
+import sys
+import copy
+import datetime as dt
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+import objects.timeseries as ts
+
+
+def create_example_timeseries():
+    arr_time = ts.create_hourly_time_axis(dt.date(2020, 1, 1), dt.date(2020, 1, 2))
+    return ts.create_standard_time_series(arr_time, np.arange(len(arr_time), dtype=float))
+
+
+def test_in_place_write_to_parent_copies_on_write():
+    ts_parent = create_example_timeseries()
+    ts_clone = ts.clone_timeseries(ts_parent)
+
+    ts_parent[:, 1] += 1
+    ts_parent[:, 0] += np.timedelta64(1, "h")
+
+    assert not ts_parent.is_shared()
+    assert ts_clone.is_shared()
+    np.testing.assert_array_equal(ts_parent[:, 1], np.arange(48) + 1)
+    np.testing.assert_array_equal(ts_clone[:, 1], np.arange(48))
+    assert ts_parent[0, 0] == dt.datetime(2020, 1, 1, 1)
+    assert ts_clone[0, 0] == dt.datetime(2020, 1, 1, 0)
+
+
+def test_deepcopy_of_shared_timeseries_is_writable():
+    ts_parent = create_example_timeseries()
+    ts_clone = ts.scale_timeseries(ts.clone_timeseries(ts_parent), 2)
+
+    ts_copy = copy.deepcopy(ts_clone)
+    ts_copy[:, 1] += 1
+
+    assert not ts_copy.is_shared()
+    np.testing.assert_array_equal(ts_copy[:, 1], 2*np.arange(48) + 1)
+    np.testing.assert_array_equal(ts_clone[:, 1], 2*np.arange(48))
+    np.testing.assert_array_equal(ts_parent[:, 1], np.arange(48))
+
+
+def test_sub_hourly_timestamps_raise():
+    arr_time = np.array(["2020-01-01T00:00", "2020-01-01T00:15"], dtype="datetime64[m]")
+
+    with pytest.raises(Exception, match="whole hours"):
+        ts.Timeseries(arr_time, [1.0, 2.0])
+    ts_hourly = ts.Timeseries(arr_time.astype("datetime64[h]").astype("datetime64[m]"), [1.0, 2.0])
+    assert ts_hourly.arr_time.dtype == np.dtype("datetime64[h]")